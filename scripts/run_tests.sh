@@ -13,6 +13,12 @@ PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 # Change to project root directory
 cd "$PROJECT_ROOT"
 
+# Debug viewer unit tests need neither the extension nor PHPUnit
+echo ""
+echo "🐍 Running Debug Viewer Unit Tests..."
+echo "----------------------------------------"
+python3 -m unittest discover -s tests/python
+
 # Check if extension module exists
 if [ ! -f "./modules/var_send.so" ]; then
     echo "❌ Extension not found. Please compile first with: make"
@@ -55,11 +61,14 @@ run_test_group "basic" "Basic Data Type Tests"
 run_test_group "arrays" "Array Tests" 
 run_test_group "objects" "Object Tests"
 run_test_group "multiple" "Multiple Arguments Tests"
+run_test_group "callsite" "Call-Site Metadata Tests"
 run_test_group "large" "Large Payload Tests"
 run_test_group "stress" "Stress Tests"
 run_test_group "performance" "Performance Tests"
+run_test_group "benchmark" "Transport Latency Benchmarks (TCP vs Unix socket)"
 run_test_group "edge" "Edge Case Tests"
 run_test_group "config" "Configuration Tests"
+run_test_group "sampling" "Sampling and Throttling Tests"
 run_test_group "connection" "Connection Tests"
 run_test_group "resources" "Resource Handling Tests"
 run_test_group "unicode" "Unicode Tests"
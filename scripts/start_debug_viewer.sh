@@ -23,6 +23,9 @@ source venv/bin/activate
 # Parse command line arguments
 HOST="127.0.0.1"
 PORT="9001"
+WORKERS="0"
+UNIX_PATH=""
+EXTRA_ARGS=()
 
 while [[ $# -gt 0 ]]; do
     case $1 in
@@ -34,18 +37,47 @@ while [[ $# -gt 0 ]]; do
             PORT="$2"
             shift 2
             ;;
+        --workers)
+            WORKERS="$2"
+            shift 2
+            ;;
+        --unix)
+            UNIX_PATH="$2"
+            shift 2
+            ;;
+        --headless)
+            EXTRA_ARGS+=("$1")
+            shift
+            ;;
+        --max-connections|--rate-limit|--rate-burst|--sample-rate|--sample-every)
+            EXTRA_ARGS+=("$1" "$2")
+            shift 2
+            ;;
         -h|--help)
-            echo "Usage: $0 [--host HOST] [--port PORT]"
+            echo "Usage: $0 [--host HOST] [--port PORT] [--unix PATH] [--workers N] [--headless] [admission options]"
             echo ""
             echo "Options:"
             echo "  --host HOST    Host to bind to (default: 127.0.0.1)"
             echo "  --port PORT    Port to listen on (default: 9001)"
+            echo "  --unix PATH    Listen on a Unix domain socket instead of TCP"
+            echo "  --workers N    SO_REUSEPORT ingest processes (default: 0, ingest in the UI process)"
+            echo "  --headless     Print messages to stdout instead of starting the terminal UI"
+            echo ""
+            echo "Admission control (passed through to the viewer):"
+            echo "  --max-connections N   Maximum concurrent client connections"
+            echo "  --rate-limit N        Messages per second per client host"
+            echo "  --rate-burst N        Token bucket burst size per client host"
+            echo "  --sample-rate P       Keep each message with probability P"
+            echo "  --sample-every N      Keep only every Nth message"
             echo "  -h, --help     Show this help message"
             echo ""
             echo "Examples:"
             echo "  $0                                    # Listen on 127.0.0.1:9001"
             echo "  $0 --host 0.0.0.0                   # Listen on all interfaces"
             echo "  $0 --host 0.0.0.0 --port 9002      # Custom host and port"
+            echo "  $0 --host 0.0.0.0 --workers 4      # Parse on 4 cores"
+            echo "  $0 --unix /tmp/var_send.sock        # Single-host Unix socket"
+            echo "  $0 --rate-limit 50 --sample-every 10  # Tame a runaway loop"
             exit 0
             ;;
         *)
@@ -56,11 +88,17 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
-echo "🌐 Starting debug viewer on $HOST:$PORT"
-echo "🔧 Configure your PHP to use: ini_set('var_send.server_host', '$HOST'); ini_set('var_send.server_port', '$PORT');"
+if [ -n "$UNIX_PATH" ]; then
+    echo "🌐 Starting debug viewer on unix:$UNIX_PATH"
+    echo "🔧 Configure your PHP to use: ini_set('var_send.server_host', 'unix:$UNIX_PATH');"
+    EXTRA_ARGS+=(--unix "$UNIX_PATH")
+else
+    echo "🌐 Starting debug viewer on $HOST:$PORT"
+    echo "🔧 Configure your PHP to use: ini_set('var_send.server_host', '$HOST'); ini_set('var_send.server_port', '$PORT');"
+fi
 echo ""
 echo "📝 Navigation: q=Quit | c=Clear | f=Filter | s=Save | ↑↓=Navigate | Tab=Switch | Esc=Exit Filter"
 echo ""
 
 # Start the debug viewer
-python debug_viewer.py --host "$HOST" --port "$PORT"
+python debug_viewer.py --host "$HOST" --port "$PORT" --workers "$WORKERS" "${EXTRA_ARGS[@]}"
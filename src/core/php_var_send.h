@@ -12,10 +12,28 @@ extern zend_module_entry var_send_module_entry;
 #include "TSRM.h"
 #endif
 
+// Number of per-call-site throttle slots (call sites are hashed into them)
+#define VAR_SEND_THROTTLE_SLOTS 256
+
+typedef struct {
+    zend_ulong hash;   // Call-site hash (file name and line)
+    zend_long second;  // Epoch second the count applies to
+    zend_long count;   // Calls sent from the call site during that second
+} var_send_throttle_slot;
+
 ZEND_BEGIN_MODULE_GLOBALS(var_send)
     char *server_host;
     zend_long server_port;
     bool enabled;
+    double sample_rate;
+    zend_long max_per_second;
+    uint64_t rng_state;
+    pid_t rng_pid;  // Process rng_state was seeded in (reseeded after fork)
+    zend_ulong calls_total;
+    zend_ulong calls_sent;
+    zend_ulong calls_sampled_out;
+    zend_ulong calls_throttled;
+    var_send_throttle_slot throttle[VAR_SEND_THROTTLE_SLOTS];
 ZEND_END_MODULE_GLOBALS(var_send)
 
 #define VAR_SEND_G(v) ZEND_MODULE_GLOBALS_ACCESSOR(var_send, v)
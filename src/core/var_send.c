@@ -1,5 +1,5 @@
 // var_send.c
-// PHP extension to send var_export-like data to a TCP server
+// PHP extension to send var_export-like data to a TCP or Unix domain socket server
 // Compatible with PHP 8.4.2
 
 #ifdef HAVE_CONFIG_H
@@ -8,15 +8,19 @@
 
 #include "php.h"
 #include "php_ini.h"
+#include "SAPI.h"
 #include "ext/standard/info.h"
 #include "ext/standard/php_var.h"
+#include "ext/random/php_random.h"
 #include "Zend/zend_smart_str.h"
 #include "php_var_send.h"
 #include <sys/socket.h>
+#include <sys/un.h>
 #include <netinet/in.h>
 #include <arpa/inet.h>
 #include <unistd.h>
 #include <string.h>
+#include <time.h>
 
 ZEND_DECLARE_MODULE_GLOBALS(var_send)
 
@@ -24,6 +28,8 @@ PHP_INI_BEGIN()
     STD_PHP_INI_ENTRY("var_send.server_host", "127.0.0.1", PHP_INI_ALL, OnUpdateString, server_host, zend_var_send_globals, var_send_globals)
     STD_PHP_INI_ENTRY("var_send.server_port", "9001", PHP_INI_ALL, OnUpdateLong, server_port, zend_var_send_globals, var_send_globals)
     STD_PHP_INI_ENTRY("var_send.enabled", "1", PHP_INI_ALL, OnUpdateBool, enabled, zend_var_send_globals, var_send_globals)
+    STD_PHP_INI_ENTRY("var_send.sample_rate", "1.0", PHP_INI_ALL, OnUpdateReal, sample_rate, zend_var_send_globals, var_send_globals)
+    STD_PHP_INI_ENTRY("var_send.max_per_second", "0", PHP_INI_ALL, OnUpdateLong, max_per_second, zend_var_send_globals, var_send_globals)
 PHP_INI_END()
 
 static void php_var_send_init_globals(zend_var_send_globals *var_send_globals)
@@ -31,6 +37,195 @@ static void php_var_send_init_globals(zend_var_send_globals *var_send_globals)
     var_send_globals->server_host = NULL;
     var_send_globals->server_port = 9001;
     var_send_globals->enabled = 1;
+    var_send_globals->sample_rate = 1.0;
+    var_send_globals->max_per_second = 0;
+    var_send_globals->calls_total = 0;
+    var_send_globals->calls_sent = 0;
+    var_send_globals->calls_sampled_out = 0;
+    var_send_globals->calls_throttled = 0;
+    memset(var_send_globals->throttle, 0, sizeof(var_send_globals->throttle));
+
+    // The sampling PRNG is seeded on first use, see var_send_random()
+    var_send_globals->rng_state = 0;
+    var_send_globals->rng_pid = 0;
+}
+
+// Find the innermost user-code frame, i.e. the PHP code that called var_send()
+static zend_execute_data *var_send_caller_frame(zend_execute_data *execute_data)
+{
+    zend_execute_data *ex = EX(prev_execute_data);
+
+    while (ex && (!ex->func || !ZEND_USER_CODE(ex->func->type))) {
+        ex = ex->prev_execute_data;
+    }
+    return ex;
+}
+
+// Append the call-site header sent at the start of every frame
+static void var_send_append_call_site(smart_str *buf, zend_execute_data *caller)
+{
+    smart_str_appends(buf, "--- Call Site ---\n");
+
+    if (caller) {
+        smart_str_appends(buf, "File: ");
+        smart_str_append(buf, caller->func->op_array.filename);
+        smart_str_appends(buf, "\nLine: ");
+        smart_str_append_long(buf, caller->opline ? (zend_long)caller->opline->lineno : 0);
+        smart_str_appends(buf, "\nFunction: ");
+        if (caller->func->common.function_name) {
+            if (caller->func->common.scope) {
+                smart_str_append(buf, caller->func->common.scope->name);
+                smart_str_appends(buf, "::");
+            }
+            smart_str_append(buf, caller->func->common.function_name);
+        } else {
+            smart_str_appends(buf, "{main}");
+        }
+        smart_str_appendc(buf, '\n');
+    }
+
+    smart_str_appends(buf, "PID: ");
+    smart_str_append_long(buf, (zend_long)getpid());
+    smart_str_appendc(buf, '\n');
+
+    if (SG(request_info).request_uri) {
+        smart_str_appends(buf, "URI: ");
+        smart_str_appends(buf, SG(request_info).request_uri);
+        smart_str_appendc(buf, '\n');
+    }
+}
+
+// Seed the sampling PRNG for the current process. Globals are initialized
+// in MINIT, before FPM and Apache prefork fork their workers, so seeding
+// there would give every worker the same sequence of sampling decisions.
+static void var_send_seed_random(pid_t pid)
+{
+    uint64_t seed = 0;
+
+    if (php_random_bytes_silent(&seed, sizeof(seed)) == FAILURE) {
+        seed = ((uint64_t)pid << 32) ^ (uint64_t)time(NULL) ^ (uint64_t)(uintptr_t)&VAR_SEND_G(rng_state);
+    }
+
+    // xorshift needs a non-zero state
+    VAR_SEND_G(rng_state) = seed ? seed : 0x9E3779B97F4A7C15ULL;
+    VAR_SEND_G(rng_pid) = pid;
+}
+
+// Uniform random number in [0, 1) from a xorshift64 generator
+static double var_send_random(void)
+{
+    pid_t pid = getpid();
+
+    if (VAR_SEND_G(rng_pid) != pid) {
+        var_send_seed_random(pid);
+    }
+
+    uint64_t x = VAR_SEND_G(rng_state);
+
+    x ^= x << 13;
+    x ^= x >> 7;
+    x ^= x << 17;
+    VAR_SEND_G(rng_state) = x;
+
+    return (double)(x >> 11) * (1.0 / 9007199254740992.0);
+}
+
+// Per-call-site limit of var_send.max_per_second calls in each second.
+// Call sites are hashed into a fixed table; a colliding call site takes
+// over the slot, which can only let extra calls through, never block them.
+static bool var_send_throttle_allows(zend_execute_data *caller)
+{
+    zend_long limit = VAR_SEND_G(max_per_second);
+    zend_ulong hash = 0;
+    zend_long now;
+    var_send_throttle_slot *slot;
+
+    if (limit <= 0) {
+        return 1;
+    }
+
+    if (caller) {
+        hash = zend_string_hash_val(caller->func->op_array.filename);
+        hash = hash * 31 + (caller->opline ? caller->opline->lineno : 0);
+    }
+
+    slot = &VAR_SEND_G(throttle)[hash % VAR_SEND_THROTTLE_SLOTS];
+    now = (zend_long)time(NULL);
+
+    if (slot->hash != hash || slot->second != now) {
+        slot->hash = hash;
+        slot->second = now;
+        slot->count = 0;
+    }
+
+    if (slot->count >= limit) {
+        return 0;
+    }
+    slot->count++;
+    return 1;
+}
+
+// Prefix of var_send.server_host selecting the Unix domain socket transport
+#define VAR_SEND_UNIX_PREFIX "unix:"
+
+// Connect to the debug server, either over IPv4 TCP or, when server_host is
+// "unix:/path/to.sock", over a Unix domain socket. Returns -1 on failure.
+static int var_send_connect(void)
+{
+    const char *host = VAR_SEND_G(server_host);
+    bool use_unix = host && strncmp(host, VAR_SEND_UNIX_PREFIX, sizeof(VAR_SEND_UNIX_PREFIX) - 1) == 0;
+    struct sockaddr_in inet_server;
+    struct sockaddr_un unix_server;
+    struct sockaddr *server;
+    socklen_t server_len;
+    int sock;
+
+    if (use_unix) {
+        const char *path = host + sizeof(VAR_SEND_UNIX_PREFIX) - 1;
+
+        if (strlen(path) >= sizeof(unix_server.sun_path)) {
+            php_error_docref(NULL, E_WARNING, "Unix socket path too long for var_send: %s", path);
+            return -1;
+        }
+
+        memset(&unix_server, 0, sizeof(unix_server));
+        unix_server.sun_family = AF_UNIX;
+        strcpy(unix_server.sun_path, path);
+        server = (struct sockaddr *)&unix_server;
+        server_len = sizeof(unix_server);
+    } else {
+        inet_server.sin_addr.s_addr = inet_addr(host);
+        inet_server.sin_family = AF_INET;
+        inet_server.sin_port = htons(VAR_SEND_G(server_port));
+        server = (struct sockaddr *)&inet_server;
+        server_len = sizeof(inet_server);
+    }
+
+    // Create socket
+    sock = socket(use_unix ? AF_UNIX : AF_INET, SOCK_STREAM, 0);
+    if (sock == -1) {
+        php_error_docref(NULL, E_WARNING, "Could not create socket for var_send");
+        return -1;
+    }
+
+    struct timeval tv;
+    tv.tv_sec = 1;  // 1 second timeout for send/receive
+    tv.tv_usec = 0;
+    setsockopt(sock, SOL_SOCKET, SO_RCVTIMEO, (const char*)&tv, sizeof tv);
+    setsockopt(sock, SOL_SOCKET, SO_SNDTIMEO, (const char*)&tv, sizeof tv);
+
+    if (connect(sock, server, server_len) < 0) {
+        if (use_unix) {
+            php_error_docref(NULL, E_WARNING, "Connect failed for var_send to %s", host);
+        } else {
+            php_error_docref(NULL, E_WARNING, "Connect failed for var_send to %s:%lld",
+                             host, (long long)VAR_SEND_G(server_port));
+        }
+        close(sock);
+        return -1;
+    }
+
+    return sock;
 }
 
 PHP_FUNCTION(var_send)
@@ -42,39 +237,38 @@ PHP_FUNCTION(var_send)
     zval *args = NULL;
     int argc = 0;
     int sock;
-    struct sockaddr_in server;
     smart_str var_data_str = {0}; // Used to build data for each variable
+    smart_str call_site_str = {0}; // Header shared by every frame of this call
 
     ZEND_PARSE_PARAMETERS_START(1, -1)
         Z_PARAM_VARIADIC('+', args, argc)
     ZEND_PARSE_PARAMETERS_END();
 
-    // Create socket
-    sock = socket(AF_INET, SOCK_STREAM, 0);
-    if (sock == -1) {
-        php_error_docref(NULL, E_WARNING, "Could not create socket for var_send");
+    VAR_SEND_G(calls_total)++;
+
+    // Sampling and throttling run before any serialization or network work
+    zend_execute_data *caller = var_send_caller_frame(execute_data);
+
+    if (VAR_SEND_G(sample_rate) < 1.0 && var_send_random() >= VAR_SEND_G(sample_rate)) {
+        VAR_SEND_G(calls_sampled_out)++;
         RETURN_FALSE;
     }
 
-    server.sin_addr.s_addr = inet_addr(VAR_SEND_G(server_host));
-    server.sin_family = AF_INET;
-    server.sin_port = htons(VAR_SEND_G(server_port));
-
-    struct timeval tv;
-    tv.tv_sec = 1;  // 1 second timeout for send/receive
-    tv.tv_usec = 0;
-    setsockopt(sock, SOL_SOCKET, SO_RCVTIMEO, (const char*)&tv, sizeof tv);
-    setsockopt(sock, SOL_SOCKET, SO_SNDTIMEO, (const char*)&tv, sizeof tv);
+    if (!var_send_throttle_allows(caller)) {
+        VAR_SEND_G(calls_throttled)++;
+        RETURN_FALSE;
+    }
 
-    if (connect(sock, (struct sockaddr *)&server, sizeof(server)) < 0) {
-        php_error_docref(NULL, E_WARNING, "Connect failed for var_send to %s:%lld",
-                         VAR_SEND_G(server_host), (long long)VAR_SEND_G(server_port));
-        close(sock);
+    sock = var_send_connect();
+    if (sock == -1) {
         RETURN_FALSE;
     }
 
+    var_send_append_call_site(&call_site_str, caller);
+
     for (int i = 0; i < argc; i++) {
         smart_str_free(&var_data_str); // Free for reuse in loop
+        smart_str_append_smart_str(&var_data_str, &call_site_str);
         smart_str_appends(&var_data_str, "\n--- Variable #");
         smart_str_append_long(&var_data_str, i + 1);
         smart_str_appends(&var_data_str, " ---\n");
@@ -142,6 +336,7 @@ PHP_FUNCTION(var_send)
             if (send(sock, &message_len_nbo, sizeof(message_len_nbo), 0) < 0) {
                 php_error_docref(NULL, E_WARNING, "Send failed for var_send message length prefix");
                 smart_str_free(&var_data_str);
+                smart_str_free(&call_site_str);
                 close(sock);
                 RETURN_FALSE;
             }
@@ -150,6 +345,7 @@ PHP_FUNCTION(var_send)
             if (send(sock, ZSTR_VAL(var_data_str.s), ZSTR_LEN(var_data_str.s), 0) < 0) {
                 php_error_docref(NULL, E_WARNING, "Send failed for var_send data");
                 smart_str_free(&var_data_str);
+                smart_str_free(&call_site_str);
                 close(sock);
                 RETURN_FALSE;
             }
@@ -158,7 +354,9 @@ PHP_FUNCTION(var_send)
 
     // Clean up
     smart_str_free(&var_data_str);
+    smart_str_free(&call_site_str);
     close(sock);
+    VAR_SEND_G(calls_sent)++;
     RETURN_TRUE;
 }
 
@@ -196,6 +394,22 @@ PHP_MINFO_FUNCTION(var_send)
     php_info_print_table_row(2, "Server Port", port_str);
 
     php_info_print_table_row(2, "Enabled", VAR_SEND_G(enabled) ? "Yes" : "No");
+
+    char buf[32];
+    snprintf(buf, sizeof(buf), "%g", VAR_SEND_G(sample_rate));
+    php_info_print_table_row(2, "Sample Rate", buf);
+    snprintf(buf, sizeof(buf), "%lld", (long long)VAR_SEND_G(max_per_second));
+    php_info_print_table_row(2, "Max Per Second Per Call Site", buf);
+
+    // Counters and throttle slots are per process (per thread under ZTS)
+    snprintf(buf, sizeof(buf), "%llu", (unsigned long long)VAR_SEND_G(calls_total));
+    php_info_print_table_row(2, "Calls", buf);
+    snprintf(buf, sizeof(buf), "%llu", (unsigned long long)VAR_SEND_G(calls_sent));
+    php_info_print_table_row(2, "Calls Sent", buf);
+    snprintf(buf, sizeof(buf), "%llu", (unsigned long long)VAR_SEND_G(calls_sampled_out));
+    php_info_print_table_row(2, "Calls Sampled Out", buf);
+    snprintf(buf, sizeof(buf), "%llu", (unsigned long long)VAR_SEND_G(calls_throttled));
+    php_info_print_table_row(2, "Calls Throttled", buf);
     php_info_print_table_end();
 }
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the var_send Debug Viewer
+Measures import cost with `python -X importtime` against a budget per
+invocation, and fails if a non-interactive path imports the UI toolkit
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+
+# (name, interpreter arguments, import-time budget in milliseconds)
+SCENARIOS = [
+    ("--help", ["debug_viewer.py", "--help"], 50),
+    ("headless", ["-c", "import debug_viewer, ingest"], 150),
+]
+
+# Modules that must only be imported once the TUI starts
+UI_MODULES = ("textual", "rich", "viewer_app")
+
+
+def measure(args: List[str]) -> Tuple[float, List[Tuple[str, int]], List[str]]:
+    """Run the interpreter once
+
+    Returns the total import time in ms, the top-level imports with their
+    cumulative time in us, and the names of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # with nested imports indented under their parent
+    top_level = []
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Column header
+        modules.append(name.strip())
+        if not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative)))
+
+    return sum(us for _, us in top_level) / 1000, top_level, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="var_send Debug Viewer startup benchmark")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Runs per scenario; the fastest counts (default: 5)")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply every budget, e.g. 2 on slow CI machines")
+    args = parser.parse_args()
+
+    failed = False
+    for name, interpreter_args, budget_ms in SCENARIOS:
+        budget_ms *= args.budget_scale
+        runs = [measure(interpreter_args) for _ in range(args.runs)]
+        best_ms, top_level, modules = min(runs, key=lambda run: run[0])
+
+        ui_imports = sorted({m for m in modules if m.split(".")[0] in UI_MODULES})
+        ok = best_ms <= budget_ms and not ui_imports
+        failed |= not ok
+
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: {best_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+        if ui_imports:
+            print(f"     imports UI modules: {', '.join(ui_imports[:5])}")
+        if best_ms > budget_ms:
+            heaviest = sorted(top_level, key=lambda item: item[1], reverse=True)[:5]
+            for module, us in heaviest:
+                print(f"     {module}: {us / 1000:.1f} ms")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Call-site index for the var_send Debug Viewer
+Groups messages by the var_send() call that produced them
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from message_parser import VarSendMessage
+
+
+# Key used for messages from extensions that don't send a call-site header
+UNKNOWN_CALL_SITE = "(unknown call site)"
+
+
+@dataclass
+class CallSiteEntry:
+    """Aggregated messages for a single var_send() call site"""
+    key: str
+    file: str
+    line: str
+    function: str
+    first_seen: datetime
+    last_seen: datetime
+    count: int = 0
+    messages: List[VarSendMessage] = field(default_factory=list)
+
+
+def call_site_key(message: VarSendMessage) -> str:
+    """Identify a call site by file and line"""
+    call_site = message.call_site
+    if 'file' not in call_site:
+        return UNKNOWN_CALL_SITE
+    return f"{call_site['file']}:{call_site.get('line', '?')}"
+
+
+class CallSiteIndex:
+    """Maps call sites to their messages, updated in O(1) per message"""
+    
+    def __init__(self):
+        self.entries: Dict[str, CallSiteEntry] = {}
+    
+    def add(self, message: VarSendMessage) -> Tuple[CallSiteEntry, bool]:
+        """Index a message, returning its entry and whether the entry is new"""
+        key = call_site_key(message)
+        entry = self.entries.get(key)
+        is_new = entry is None
+        
+        if is_new:
+            entry = CallSiteEntry(
+                key=key,
+                file=message.call_site.get('file', ''),
+                line=message.call_site.get('line', ''),
+                function=message.call_site.get('function', ''),
+                first_seen=message.timestamp,
+                last_seen=message.timestamp
+            )
+            self.entries[key] = entry
+        
+        entry.count += 1
+        entry.last_seen = message.timestamp
+        entry.messages.append(message)
+        return entry, is_new
+    
+    def get(self, key: str) -> Optional[CallSiteEntry]:
+        return self.entries.get(key)
+    
+    def clear(self) -> None:
+        self.entries.clear()
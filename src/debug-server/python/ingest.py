@@ -0,0 +1,650 @@
+"""
+Ingestion layer for the var_send Debug Viewer
+Length-prefixed framing plus optional SO_REUSEPORT ingest worker processes
+"""
+
+import asyncio
+import errno
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import stat
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing.connection import Connection
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from message_parser import MAX_MESSAGE_LENGTH, MessageParser, VarSendMessage
+
+# Upper bound on tracked per-client token buckets (least recently seen are evicted)
+MAX_TRACKED_CLIENTS = 1024
+
+# Worker pipe batches handled per event-loop callback, so that one busy worker
+# cannot starve the other pipes and the UI
+MAX_BATCHES_PER_DRAIN = 8
+
+# How often an ingest worker checks that the UI process is still alive, in seconds
+PARENT_CHECK_INTERVAL = 1.0
+
+
+class FrameError(Exception):
+    """Raised when a client sends a malformed length-prefixed frame"""
+
+
+async def read_frames(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    """Yield every length-prefixed frame sent on a connection until EOF"""
+    while True:
+        try:
+            length_data = await reader.readexactly(4)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise FrameError(f"Incomplete length prefix: got {len(e.partial)} bytes")
+            return
+
+        # Unpack the length (network byte order)
+        message_length = struct.unpack('!I', length_data)[0]
+        if message_length <= 0 or message_length > MAX_MESSAGE_LENGTH:
+            raise FrameError(f"Invalid message length: {message_length}")
+
+        try:
+            message_data = await reader.readexactly(message_length)
+        except asyncio.IncompleteReadError as e:
+            raise FrameError(f"Incomplete message: got {len(e.partial)}, expected {message_length}")
+
+        yield message_data
+
+
+@dataclass
+class AdmissionPolicy:
+    """Limits applied to incoming connections and messages (0 disables a limit)"""
+    max_connections: int = 0
+    rate_limit: float = 0.0
+    rate_burst: int = 0
+    sample_rate: float = 1.0
+    sample_every: int = 1
+
+    def burst(self) -> int:
+        """Token bucket size: rate_burst, or one second of rate_limit (at least 1)"""
+        return self.rate_burst or max(1, int(self.rate_limit))
+
+    def split(self, workers: int) -> 'AdmissionPolicy':
+        """Divide the global limits between ingest workers without exceeding them
+
+        Raises ValueError if max_connections or the burst is lower than the
+        number of workers, since some worker would then get no share of it.
+        """
+        if self.max_connections and self.max_connections < workers:
+            raise ValueError(
+                f"max_connections ({self.max_connections}) must be at least "
+                f"the number of workers ({workers})"
+            )
+        if self.rate_limit and self.burst() < workers:
+            raise ValueError(
+                f"rate burst ({self.burst()}) must be at least the number of workers "
+                f"({workers}); it defaults to one second of the rate limit"
+            )
+        return AdmissionPolicy(
+            max_connections=self.max_connections // workers,
+            rate_limit=self.rate_limit / workers,
+            rate_burst=self.burst() // workers if self.rate_limit else 0,
+            sample_rate=self.sample_rate,
+            sample_every=self.sample_every
+        )
+
+
+class AdmissionController:
+    """Connection limit, per-client token buckets and message sampling
+
+    Decisions are made before a frame is decoded or parsed, so shed load
+    costs little more than reading the bytes off the socket. Dropped
+    messages are tallied in `counters`, which callers collect with
+    take_counters().
+    """
+
+    def __init__(self, policy: AdmissionPolicy):
+        self.policy = policy
+        self.active_connections = 0
+        self.counters: Dict[str, int] = {'rejected': 0, 'rate_limited': 0, 'sampled_out': 0}
+        self.buckets: 'OrderedDict[str, List[float]]' = OrderedDict()
+        self.seen = 0
+        self.burst = float(policy.burst())
+
+    def admit_connection(self) -> bool:
+        """Reserve a connection slot, counting a rejection if none is free"""
+        if self.policy.max_connections and self.active_connections >= self.policy.max_connections:
+            self.counters['rejected'] += 1
+            return False
+        self.active_connections += 1
+        return True
+
+    def release_connection(self) -> None:
+        """Free a slot reserved by admit_connection()"""
+        self.active_connections -= 1
+
+    def admit_message(self, client_addr: str) -> bool:
+        """Decide whether a message from client_addr should be processed"""
+        policy = self.policy
+
+        # Sampling first, so messages sampled out don't consume tokens
+        self.seen += 1
+        if policy.sample_every > 1 and self.seen % policy.sample_every:
+            self.counters['sampled_out'] += 1
+            return False
+        if policy.sample_rate < 1.0 and random.random() >= policy.sample_rate:
+            self.counters['sampled_out'] += 1
+            return False
+
+        if policy.rate_limit > 0 and not self._take_token(client_addr):
+            self.counters['rate_limited'] += 1
+            return False
+
+        return True
+
+    def _take_token(self, client_addr: str) -> bool:
+        """Token bucket keyed by client host (ports are ephemeral per call)"""
+        now = time.monotonic()
+        bucket = self.buckets.get(client_addr)
+        if bucket is None:
+            bucket = [self.burst, now]
+            self.buckets[client_addr] = bucket
+            if len(self.buckets) > MAX_TRACKED_CLIENTS:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(client_addr)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.policy.rate_limit)
+            bucket[1] = now
+
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
+
+    def take_counters(self) -> Dict[str, int]:
+        """Return drop counters accumulated since the last call and reset them"""
+        counters = self.counters
+        self.counters = {'rejected': 0, 'rate_limited': 0, 'sampled_out': 0}
+        return counters
+
+
+def peer_address(writer: asyncio.StreamWriter) -> Tuple[str, int]:
+    """Return (address, port) for the peer of a connection"""
+    addr = writer.get_extra_info('peername')
+    if not isinstance(addr, tuple):
+        # Unix domain socket clients are unnamed
+        return "unix", 0
+    return addr[0], addr[1]
+
+
+ClientHandler = Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]
+
+
+# Pending-connection queue length (asyncio's default for start_server)
+LISTEN_BACKLOG = 100
+
+
+def open_listener_socket(host: str, port: int, unix_path: Optional[str] = None,
+                         reuse_port: bool = False) -> socket.socket:
+    """Bind and listen on TCP host:port, or on a Unix domain socket path
+
+    Binding is done synchronously, before any event loop runs, so callers
+    can report an address in use before starting the UI. Raises OSError.
+    """
+    if not unix_path:
+        return socket.create_server((host, port), backlog=LISTEN_BACKLOG, reuse_port=reuse_port)
+
+    remove_stale_socket(unix_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(unix_path)
+        sock.listen(LISTEN_BACKLOG)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+async def start_listener(handler: ClientHandler, sock: socket.socket) -> asyncio.Server:
+    """Serve connections on a socket from open_listener_socket()"""
+    if sock.family == socket.AF_UNIX:
+        return await asyncio.start_unix_server(handler, sock=sock)
+    return await asyncio.start_server(handler, sock=sock)
+
+
+def remove_stale_socket(path: str) -> None:
+    """Remove a socket file left behind by a previous run
+
+    Raises OSError (EADDRINUSE) if another process is still listening on it.
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+
+    # Only a refused connection proves that nobody owns the socket any more
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+
+    raise OSError(errno.EADDRINUSE, f"Another process is listening on {path}")
+
+
+class _WorkerServer:
+    """Listener running inside an ingest worker process
+
+    Parsed messages are batched per event-loop iteration and forwarded to
+    the UI process as compact tuples. Variables carry contents_span offsets
+    into raw_text rather than a second copy of their contents:
+        ('message', timestamp, client_addr, client_port, raw_text, variables, call_site, size_bytes)
+        ('drops', {'rejected': n, 'rate_limited': n, 'sampled_out': n})
+        ('error', text)
+    """
+
+    def __init__(self, conn: Connection, policy: AdmissionPolicy):
+        self.conn = conn
+        self.admission = AdmissionController(policy)
+        self.pending: List[tuple] = []
+        self.flush_scheduled = False
+        # Set once the UI process is gone; the worker then stops serving
+        self.stopped = asyncio.Event()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read, decode and parse every frame on a connection"""
+        if not self.admission.admit_connection():
+            self.schedule_flush()
+            writer.close()
+            return
+
+        client_addr, client_port = peer_address(writer)
+
+        try:
+            async for frame in read_frames(reader):
+                if not self.admission.admit_message(client_addr):
+                    self.schedule_flush()
+                    continue
+                raw_text = frame.decode('utf-8', errors='replace')
+                self.emit((
+                    'message', time.time(), client_addr, client_port, raw_text,
+                    MessageParser.parse_message(raw_text, with_contents=False),
+                    MessageParser.parse_call_site(raw_text),
+                    len(frame)
+                ))
+        except FrameError as e:
+            self.emit(('error', str(e)))
+        except asyncio.CancelledError:
+            pass  # Worker is stopping and nobody is left to receive the message
+        except Exception as e:
+            self.emit(('error', f"Connection error: {e}"))
+        finally:
+            self.admission.release_connection()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def emit(self, record: tuple) -> None:
+        """Queue a record and schedule a flush on the next loop iteration"""
+        self.pending.append(record)
+        self.schedule_flush()
+
+    def schedule_flush(self) -> None:
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self) -> None:
+        """Send all queued records to the UI process in a single pipe write"""
+        batch, self.pending = self.pending, []
+        self.flush_scheduled = False
+        drops = self.admission.take_counters()
+        if any(drops.values()):
+            batch.append(('drops', drops))
+        if batch:
+            try:
+                self.conn.send(batch)
+            except OSError:
+                # UI process has closed its end (BrokenPipeError): stop
+                # accepting connections whose messages would be lost
+                self.stopped.set()
+
+    async def watch_parent(self, parent_pid: int) -> None:
+        """Stop the worker once the UI process has exited
+
+        Covers a UI process killed without terminating its workers, which
+        would otherwise be re-parented and keep holding the port.
+        """
+        while os.getppid() == parent_pid:
+            await asyncio.sleep(PARENT_CHECK_INTERVAL)
+        self.stopped.set()
+
+
+async def _serve_worker(sock: socket.socket, conn: Connection, policy: AdmissionPolicy,
+                        parent_pid: int) -> None:
+    worker = _WorkerServer(conn, policy)
+    try:
+        server = await start_listener(worker.handle_client, sock)
+    except Exception as e:
+        conn.send([('error', f"Ingest worker failed to listen: {e}")])
+        return
+
+    watcher = asyncio.create_task(worker.watch_parent(parent_pid))
+    try:
+        await worker.stopped.wait()
+    finally:
+        # Release the port right away; asyncio.run() cancels open connections
+        watcher.cancel()
+        server.close()
+
+
+def _worker_main(sock: socket.socket, conn: Connection, policy: AdmissionPolicy,
+                 parent_pid: int, ui_conns: List[Connection],
+                 other_socks: List[socket.socket]) -> None:
+    """Entry point of an ingest worker process"""
+    # Ctrl+C is handled by the UI process, which terminates the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Close the UI's pipe ends inherited through fork, so a pipe breaks as
+    # soon as the UI process closes it, and the other workers' listening
+    # sockets, so a dead worker's socket leaves the SO_REUSEPORT group
+    for ui_conn in ui_conns:
+        ui_conn.close()
+    for other in other_socks:
+        other.close()
+    try:
+        asyncio.run(_serve_worker(sock, conn, policy, parent_pid))
+    finally:
+        conn.close()
+
+
+class IngestWorkerPool:
+    """Spawns N ingest processes bound to the same port with SO_REUSEPORT
+
+    The kernel load-balances incoming connections across the workers, each
+    of which does framing and parsing on its own core and forwards parsed
+    records to the UI process over a pipe. Admission limits are split
+    between the workers (see AdmissionPolicy.split).
+    """
+
+    def __init__(self, host: str, port: int, workers: int,
+                 policy: Optional[AdmissionPolicy] = None):
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.policy = policy or AdmissionPolicy()
+        self.worker_policy = self.policy.split(workers)
+        self.processes: List[multiprocessing.Process] = []
+        self.connections: List[Connection] = []
+
+    def start(self) -> List[Connection]:
+        """Start the worker processes, returning the receiving pipe ends
+
+        The listening sockets are bound here, before forking, so an address
+        in use raises OSError in the caller. Must be called before the UI
+        starts any threads, as workers are forked where the platform allows it.
+        """
+        if 'fork' in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context('fork')
+        else:
+            ctx = multiprocessing.get_context()
+
+        # One SO_REUSEPORT socket per worker, so the kernel balances between them
+        sockets: List[socket.socket] = []
+        try:
+            for _ in range(self.workers):
+                sockets.append(open_listener_socket(self.host, self.port, reuse_port=True))
+        except OSError:
+            for sock in sockets:
+                sock.close()
+            raise
+
+        for i, sock in enumerate(sockets):
+            recv_conn, send_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_worker_main,
+                args=(sock, send_conn, self.worker_policy, os.getpid(),
+                      self.connections + [recv_conn], sockets[:i] + sockets[i + 1:]),
+                daemon=True
+            )
+            process.start()
+            send_conn.close()
+            self.processes.append(process)
+            self.connections.append(recv_conn)
+
+        # Only the workers accept; a socket left open here would queue
+        # connections that nobody serves
+        for sock in sockets:
+            sock.close()
+
+        return self.connections
+
+    def stop(self) -> None:
+        """Terminate all worker processes"""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout=1)
+        for conn in self.connections:
+            conn.close()
+
+        self.processes.clear()
+        self.connections.clear()
+
+
+def receive_records(conn: Connection, max_batches: int = MAX_BATCHES_PER_DRAIN) -> Optional[List[tuple]]:
+    """Read up to max_batches batches currently readable on a worker pipe
+
+    Anything left stays readable and is picked up on the next loop
+    iteration. Returns None once the worker has exited and the pipe is closed.
+    """
+    records: List[tuple] = []
+    try:
+        for _ in range(max_batches):
+            if not conn.poll():
+                break
+            records.extend(conn.recv())
+    except (EOFError, OSError):
+        return records or None
+    return records
+
+
+class Receiver:
+    """Receives var_send messages independently of any UI
+
+    Either listens itself (TCP or Unix socket) or drains the pipes of an
+    IngestWorkerPool, and reports through three callbacks:
+        on_message(VarSendMessage), on_status(text), on_drops(counters)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9001,
+                 policy: Optional[AdmissionPolicy] = None,
+                 unix_path: Optional[str] = None,
+                 worker_pool: Optional[IngestWorkerPool] = None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.address = f"unix:{unix_path}" if unix_path else f"{host}:{port}"
+        self.worker_pool = worker_pool
+        self.admission = AdmissionController(policy or AdmissionPolicy())
+        self.sock: Optional[socket.socket] = None
+        self.server: Optional[asyncio.Server] = None
+        self.message_counter = 0
+        self.open_pipes = 0
+        self.workers_exited: Optional[asyncio.Event] = None
+
+        self.on_message: Callable[[VarSendMessage], None] = lambda message: None
+        self.on_status: Callable[[str], None] = lambda text: None
+        self.on_drops: Callable[[Dict[str, int]], None] = lambda drops: None
+
+    def bind(self) -> None:
+        """Bind the listening socket without serving yet
+
+        Lets callers report an unusable address (OSError) before starting
+        a UI; start() binds by itself if this was not called.
+        """
+        if self.sock is None and not self.worker_pool:
+            self.sock = open_listener_socket(self.host, self.port, self.unix_path)
+
+    def close(self) -> None:
+        """Close the listening socket and remove the Unix socket file we created"""
+        if self.sock is None:
+            return
+        self.sock.close()
+        if self.unix_path:
+            try:
+                os.unlink(self.unix_path)
+            except FileNotFoundError:
+                pass
+
+    async def start(self) -> None:
+        """Start receiving until the listener fails or every ingest worker exits
+
+        Failures are reported through on_status and then raised.
+        """
+        if self.worker_pool:
+            # Ingest workers own the listening sockets; we only drain their pipes
+            await self.receive_from_workers()
+            return
+
+        try:
+            self.bind()
+            self.server = await start_listener(self.handle_client, self.sock)
+
+            self.on_status(f"Listening on {self.address}")
+
+            # Start serving
+            await self.server.serve_forever()
+
+        except Exception as e:
+            self.on_status(f"Error: {e}")
+            raise
+
+    async def receive_from_workers(self) -> None:
+        """Receive parsed records from the SO_REUSEPORT ingest workers
+
+        Returns once every worker pipe has closed, raising RuntimeError as
+        nothing is listening any more.
+        """
+        loop = asyncio.get_running_loop()
+        self.open_pipes = len(self.worker_pool.connections)
+        self.workers_exited = asyncio.Event()
+        for conn in self.worker_pool.connections:
+            loop.add_reader(conn.fileno(), self._drain_worker, conn)
+
+        self.on_status(f"Listening on {self.address} ({self.worker_pool.workers} ingest workers)")
+
+        await self.workers_exited.wait()
+        self.on_status("Error: all ingest workers exited")
+        raise RuntimeError("All ingest workers exited")
+
+    def _drain_worker(self, conn: Connection) -> None:
+        """Dispatch a bounded number of records queued on a worker pipe"""
+        records = receive_records(conn)
+        if records is None:
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+            self.open_pipes -= 1
+            if self.open_pipes:
+                self.on_status("Ingest worker exited")
+            else:
+                self.workers_exited.set()
+            return
+
+        for record in records:
+            if record[0] == 'message':
+                _, timestamp, client_addr, client_port, raw_data, variables, call_site, size_bytes = record
+                MessageParser.attach_contents(raw_data, variables)
+                self._emit_message(
+                    datetime.fromtimestamp(timestamp), client_addr, client_port,
+                    raw_data, variables, call_site, size_bytes
+                )
+            elif record[0] == 'drops':
+                self.on_drops(record[1])
+            elif record[0] == 'error':
+                self.on_status(record[1])
+
+    def publish_drops(self) -> None:
+        """Report drop counters accumulated by the in-process listener
+
+        Called periodically rather than per message.
+        """
+        drops = self.admission.take_counters()
+        if any(drops.values()):
+            self.on_drops(drops)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handle incoming client connection"""
+        if not self.admission.admit_connection():
+            writer.close()
+            return
+
+        client_addr, client_port = peer_address(writer)
+
+        # Report that we got a connection
+        self.on_status(f"Client connected: {client_addr}:{client_port}")
+
+        try:
+            # var_send() sends one frame per variable on the same connection
+            async for message_data in read_frames(reader):
+                # Shed load before spending time on decoding and parsing
+                if not self.admission.admit_message(client_addr):
+                    continue
+
+                # Decode and process the message
+                try:
+                    raw_text = message_data.decode('utf-8', errors='replace')
+                    self.process_message(raw_text, client_addr, client_port, len(message_data))
+                except Exception as e:
+                    self.on_status(f"Message processing error: {e}")
+
+        except FrameError as e:
+            self.on_status(str(e))
+        except Exception as e:
+            self.on_status(f"Connection error: {e}")
+        finally:
+            self.admission.release_connection()
+            # Reset status when client disconnects
+            self.on_status(f"Listening on {self.address}")
+            writer.close()
+            await writer.wait_closed()
+
+    def process_message(self, raw_data: str, client_addr: str, client_port: int, size_bytes: int) -> None:
+        """Process a received var_send message"""
+        # Parse the message
+        variables = MessageParser.parse_message(raw_data)
+        call_site = MessageParser.parse_call_site(raw_data)
+        self._emit_message(datetime.now(), client_addr, client_port, raw_data, variables, call_site, size_bytes)
+
+    def _emit_message(self, timestamp: datetime, client_addr: str, client_port: int,
+                      raw_data: str, variables: List[Dict], call_site: Dict[str, str],
+                      size_bytes: int) -> None:
+        """Wrap a parsed message and hand it to on_message"""
+        self.message_counter += 1
+
+        # Create message object
+        message = VarSendMessage(
+            timestamp=timestamp,
+            client_addr=client_addr,
+            client_port=client_port,
+            raw_data=raw_data,
+            variables=variables,
+            message_id=self.message_counter,
+            size_bytes=size_bytes,
+            call_site=call_site
+        )
+
+        self.on_message(message)
@@ -0,0 +1,178 @@
+"""
+Message model and parser for the var_send Debug Viewer
+Kept free of UI imports so ingest worker processes can parse frames cheaply
+"""
+
+from datetime import datetime
+from typing import Dict, List
+from dataclasses import dataclass, field
+
+
+# Sanity limit for a single frame (matches the original viewer check)
+MAX_MESSAGE_LENGTH = 10 * 1024 * 1024
+
+
+@dataclass
+class VarSendMessage:
+    """Represents a received var_send message"""
+    timestamp: datetime
+    client_addr: str
+    client_port: int
+    raw_data: str
+    variables: List[Dict] = field(default_factory=list)
+    message_id: int = 0
+    size_bytes: int = 0
+    call_site: Dict[str, str] = field(default_factory=dict)
+
+
+class MessageParser:
+    """Parses var_send messages and extracts structured data"""
+    
+    # Call-site header fields sent by the extension, mapped to dict keys
+    CALL_SITE_FIELDS = {
+        'File': 'file',
+        'Line': 'line',
+        'Function': 'function',
+        'PID': 'pid',
+        'URI': 'uri',
+    }
+    
+    @staticmethod
+    def parse_call_site(raw_data: str) -> Dict[str, str]:
+        """Extract the call-site header that precedes the first variable"""
+        call_site = {}
+        in_header = False
+        
+        # Only look at the header, variable contents can be megabytes long
+        end = raw_data.find('--- Variable #')
+        header = raw_data if end < 0 else raw_data[:end]
+        
+        for line in header.split('\n'):
+            line = line.strip()
+            
+            if line == '--- Call Site ---':
+                in_header = True
+            elif in_header and ': ' in line:
+                name, value = line.split(': ', 1)
+                key = MessageParser.CALL_SITE_FIELDS.get(name)
+                if key:
+                    call_site[key] = value
+        
+        return call_site
+    
+    @staticmethod
+    def parse_message(raw_data: str, with_contents: bool = True) -> List[Dict]:
+        """Parse raw var_send data into structured variables
+        
+        With with_contents=False, array and object contents are not copied out
+        of raw_data: metadata['contents_span'] holds their (start, end) offsets
+        instead, to be resolved with attach_contents(). Ingest workers use this
+        to keep the records they pipe to the UI process compact.
+        """
+        variables = []
+        text = raw_data.strip()
+        base = len(raw_data) - len(raw_data.lstrip())
+        lines = text.split('\n')
+        
+        # Offset of every line in raw_data, so contents can be sliced out
+        line_starts = []
+        offset = base
+        for line in lines:
+            line_starts.append(offset)
+            offset += len(line) + 1
+        
+        current_var = None
+        collecting_content = False
+        content_first = content_last = None
+        
+        def store_contents() -> None:
+            if content_first is None:
+                span = (0, 0)
+            else:
+                span = (line_starts[content_first], line_starts[content_last] + len(lines[content_last]))
+            if with_contents:
+                current_var['metadata']['contents'] = raw_data[span[0]:span[1]]
+            else:
+                current_var['metadata']['contents_span'] = span
+        
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            
+            if line.startswith('--- Variable #'):
+                # Save previous variable if exists
+                if current_var:
+                    if collecting_content:
+                        store_contents()
+                    variables.append(current_var)
+                
+                # Reset state
+                collecting_content = False
+                content_first = content_last = None
+                
+                # Start new variable
+                var_num = line.split('#')[1].split(' ')[0]
+                current_var = {
+                    'number': int(var_num),
+                    'type': 'unknown',
+                    'value': '',
+                    'metadata': {}
+                }
+            
+            elif line.startswith('Type: ') and current_var:
+                current_var['type'] = line[6:].strip()
+            
+            elif line.startswith('Value: ') and current_var:
+                current_var['value'] = line[7:].strip()
+            
+            elif line.startswith('Array with ') and current_var:
+                count = line.split(' ')[2]
+                current_var['metadata']['element_count'] = count
+                current_var['value'] = f"Array with {count} elements"
+            
+            elif line.startswith('Object of class ') and current_var:
+                class_name = line[16:].strip().strip("'")
+                current_var['metadata']['class_name'] = class_name
+                current_var['value'] = f"Object of class '{class_name}'"
+            
+            elif line.startswith('Array contents:') and current_var:
+                # Start collecting content from next line
+                collecting_content = True
+                content_first = content_last = None
+            
+            elif line.startswith('Object contents:') and current_var:
+                # Start collecting content from next line  
+                collecting_content = True
+                content_first = content_last = None
+            
+            elif collecting_content and current_var:
+                # We're collecting multi-line content
+                if line.startswith('---END---'):
+                    # Hit end marker, stop collecting
+                    store_contents()
+                    collecting_content = False
+                    content_first = content_last = None
+                    # Don't increment i, reprocess this line
+                    continue
+                # Add to content (original line, including empty ones)
+                if content_first is None:
+                    content_first = i
+                content_last = i
+            
+            i += 1
+        
+        # Save final variable
+        if current_var:
+            if collecting_content:
+                store_contents()
+            variables.append(current_var)
+        
+        return variables
+    
+    @staticmethod
+    def attach_contents(raw_data: str, variables: List[Dict]) -> None:
+        """Resolve contents_span offsets from parse_message(with_contents=False)"""
+        for variable in variables:
+            span = variable['metadata'].pop('contents_span', None)
+            if span is not None:
+                variable['metadata']['contents'] = raw_data[span[0]:span[1]]
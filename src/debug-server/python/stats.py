@@ -0,0 +1,195 @@
+"""
+Rolling-window statistics for the var_send Debug Viewer
+Fixed-size structures only: recording a message never allocates per message
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from message_parser import MAX_MESSAGE_LENGTH
+
+
+# Longest rate window, in seconds (one ring slot per second)
+WINDOW_SECONDS = 300
+
+# Maximum number of client hosts tracked by the heavy-hitters table
+MAX_TRACKED_HOSTS = 32
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+class RollingCounter:
+    """Per-second message and byte counts in a ring buffer of fixed size"""
+
+    def __init__(self, slots: int = WINDOW_SECONDS):
+        self.slots = slots
+        self.counts = [0] * slots
+        self.bytes = [0] * slots
+        self.stamps = [-1] * slots
+
+    def add(self, second: int, size_bytes: int) -> None:
+        """Count one message of size_bytes in the given epoch second"""
+        i = second % self.slots
+        if self.stamps[i] != second:
+            # Slot still holds a second that has rolled out of the window
+            self.stamps[i] = second
+            self.counts[i] = 0
+            self.bytes[i] = 0
+        self.counts[i] += 1
+        self.bytes[i] += size_bytes
+
+    def totals(self, now: int, seconds: int) -> Tuple[int, int]:
+        """Messages and bytes in the last `seconds` complete seconds before now"""
+        messages = total_bytes = 0
+        for second in range(now - seconds, now):
+            i = second % self.slots
+            if self.stamps[i] == second:
+                messages += self.counts[i]
+                total_bytes += self.bytes[i]
+        return messages, total_bytes
+
+    def series(self, now: int, seconds: int, use_bytes: bool = False) -> List[int]:
+        """Per-second values for the last `seconds` complete seconds, oldest first"""
+        source = self.bytes if use_bytes else self.counts
+        values = []
+        for second in range(now - seconds, now):
+            i = second % self.slots
+            values.append(source[i] if self.stamps[i] == second else 0)
+        return values
+
+    def reset(self) -> None:
+        for i in range(self.slots):
+            self.stamps[i] = -1
+
+
+class SizeSketch:
+    """Streaming quantile sketch for message sizes
+
+    Log-spaced buckets (DDSketch style) give quantiles within `accuracy`
+    relative error using a fixed, preallocated bucket array.
+    """
+
+    def __init__(self, accuracy: float = 0.02, max_value: int = MAX_MESSAGE_LENGTH):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        # Bucket 0 holds zero-sized values, bucket i covers (gamma^(i-2), gamma^(i-1)]
+        self.buckets = [0] * (self._index(max_value) + 2)
+        self.count = 0
+
+    def _index(self, value: int) -> int:
+        if value <= 0:
+            return 0
+        return max(1, math.ceil(math.log(value) / self.log_gamma) + 1)
+
+    def add(self, value: int) -> None:
+        self.buckets[min(self._index(value), len(self.buckets) - 1)] += 1
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0..1), or None when empty"""
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen > rank:
+                if i == 0:
+                    return 0.0
+                # Midpoint of the bucket in relative terms
+                return 2 * self.gamma ** (i - 1) / (self.gamma + 1)
+        return None
+
+    def reset(self) -> None:
+        for i in range(len(self.buckets)):
+            self.buckets[i] = 0
+        self.count = 0
+
+
+class HostTable:
+    """Per-host message and byte totals with bounded cardinality
+
+    Uses the Space-Saving algorithm: once `capacity` hosts are tracked, a
+    new host replaces the least active one and inherits its count, so the
+    busiest hosts are always retained with a bounded overestimate.
+    """
+
+    def __init__(self, capacity: int = MAX_TRACKED_HOSTS):
+        self.capacity = capacity
+        # host -> [messages, bytes, overestimate]
+        self.entries: Dict[str, List[int]] = {}
+
+    def add(self, host: str, size_bytes: int) -> None:
+        entry = self.entries.get(host)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] += size_bytes
+            return
+
+        if len(self.entries) < self.capacity:
+            self.entries[host] = [1, size_bytes, 0]
+            return
+
+        # Evict the least active host; only happens for hosts not yet tracked
+        victim = min(self.entries, key=lambda h: self.entries[h][0])
+        floor = self.entries.pop(victim)[0]
+        self.entries[host] = [floor + 1, size_bytes, floor]
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """The n busiest hosts as (host, messages, bytes)"""
+        ranked = sorted(self.entries.items(), key=lambda item: item[1][0], reverse=True)
+        return [(host, entry[0], entry[1]) for host, entry in ranked[:n]]
+
+    def reset(self) -> None:
+        self.entries.clear()
+
+
+class StatsEngine:
+    """Aggregates message statistics for the stats area"""
+
+    def __init__(self):
+        self.rolling = RollingCounter()
+        self.sizes = SizeSketch()
+        self.hosts = HostTable()
+        self.reset()
+
+    def reset(self) -> None:
+        self.start_time = time.time()
+        self.message_count = 0
+        self.total_bytes = 0
+        self.drops: Dict[str, int] = {'rejected': 0, 'rate_limited': 0, 'sampled_out': 0}
+        self.rolling.reset()
+        self.sizes.reset()
+        self.hosts.reset()
+
+    def record(self, client_addr: str, size_bytes: int, now: Optional[float] = None) -> None:
+        """Account for one received message"""
+        self.message_count += 1
+        self.total_bytes += size_bytes
+        self.rolling.add(int(time.time() if now is None else now), size_bytes)
+        self.sizes.add(size_bytes)
+        self.hosts.add(client_addr, size_bytes)
+
+    def record_drops(self, drops: Dict[str, int]) -> None:
+        """Add admission-control drop counters reported by the receiver"""
+        for key, count in drops.items():
+            self.drops[key] += count
+
+    def rates(self, seconds: int, now: Optional[float] = None) -> Tuple[float, float]:
+        """Average (messages/s, bytes/s) over the last `seconds` complete seconds"""
+        now = time.time() if now is None else now
+        # Don't dilute averages with time before the viewer started
+        span = max(1, min(seconds, int(now - self.start_time)))
+        messages, total_bytes = self.rolling.totals(int(now), span)
+        return messages / span, total_bytes / span
+
+
+def sparkline(values: List[int]) -> str:
+    """Render values as a row of unicode block characters"""
+    peak = max(values) if values else 0
+    if not peak:
+        return SPARK_BLOCKS[0] * len(values)
+    scale = (len(SPARK_BLOCKS) - 1) / peak
+    return "".join(SPARK_BLOCKS[round(value * scale)] for value in values)
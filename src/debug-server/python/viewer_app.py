@@ -0,0 +1,696 @@
+"""
+Terminal UI for the var_send Debug Viewer
+Imported only when the TUI starts, so headless use never loads Textual or Rich
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from textual.app import App, ComposeResult
+from textual.containers import Container, Horizontal, VerticalScroll
+from textual.widgets import DataTable, Header, Input, Static, TabbedContent, TabPane
+from textual.binding import Binding
+from textual.message import Message
+from rich.console import Group
+from rich.syntax import Syntax
+from rich.panel import Panel
+from rich.table import Table
+
+from message_parser import VarSendMessage
+from ingest import Receiver
+from stats import StatsEngine, sparkline
+from callsites import CallSiteEntry, CallSiteIndex
+
+
+class NewMessageEvent(Message):
+    """Custom message for new var_send messages"""
+    
+    def __init__(self, var_send_message: VarSendMessage) -> None:
+        super().__init__()
+        self.var_send_message = var_send_message
+
+
+class MessageListWidget(Static):
+    """Widget displaying the list of received messages"""
+    
+    def __init__(self):
+        super().__init__()
+        self.messages: List[VarSendMessage] = []
+        self.selected_index = 0
+    
+    def compose(self) -> ComposeResult:
+        yield DataTable(id="message-table")
+    
+    def on_mount(self) -> None:
+        table = self.query_one("#message-table", DataTable)
+        table.add_columns("Time", "Client", "Call Site", "Variables", "Size", "Preview")
+        table.cursor_type = "row"
+        table.zebra_stripes = True
+    
+    def add_message(self, message: VarSendMessage) -> None:
+        """Add a new message to the list"""
+        self.messages.append(message)
+        table = self.query_one("#message-table", DataTable)
+        table.add_row(*self.format_row(message))
+        
+        # Auto-scroll to latest
+        if len(self.messages) > 1:
+            table.move_cursor(row=len(self.messages) - 1)
+    
+    def format_row(self, message: VarSendMessage) -> Tuple[str, ...]:
+        """Format a message as a table row"""
+        time_str = message.timestamp.strftime("%H:%M:%S")
+        client_str = f"{message.client_addr}:{message.client_port}"
+        var_count = len(message.variables)
+        size_str = self._format_size(message.size_bytes)
+        
+        call_site_str = ""
+        if 'file' in message.call_site:
+            call_site_str = f"{os.path.basename(message.call_site['file'])}:{message.call_site.get('line', '?')}"
+        
+        # Create preview from first variable
+        preview = "Empty"
+        if message.variables:
+            first_var = message.variables[0]
+            preview = f"{first_var['type']}: {first_var['value'][:30]}"
+            if len(first_var['value']) > 30:
+                preview += "..."
+        
+        return (time_str, client_str, call_site_str, str(var_count), size_str, preview)
+    
+    def _format_size(self, size_bytes: int) -> str:
+        """Format byte size in human readable format"""
+        if size_bytes < 1024:
+            return f"{size_bytes}B"
+        elif size_bytes < 1024 * 1024:
+            return f"{size_bytes / 1024:.1f}KB"
+        else:
+            return f"{size_bytes / (1024 * 1024):.1f}MB"
+    
+    def get_selected_message(self) -> Optional[VarSendMessage]:
+        """Get the currently selected message"""
+        table = self.query_one("#message-table", DataTable)
+        if table.cursor_row < len(self.messages):
+            return self.messages[table.cursor_row]
+        return None
+
+
+class CallSiteWidget(Static):
+    """Widget grouping messages by the var_send() call site that sent them"""
+    
+    def __init__(self):
+        super().__init__()
+        self.index = CallSiteIndex()
+    
+    def compose(self) -> ComposeResult:
+        yield DataTable(id="callsite-table")
+    
+    def on_mount(self) -> None:
+        table = self.query_one("#callsite-table", DataTable)
+        table.add_column("Call Site", key="site")
+        table.add_column("Function", key="function")
+        table.add_column("Count", key="count")
+        table.add_column("Last Seen", key="last_seen")
+        table.cursor_type = "row"
+        table.zebra_stripes = True
+    
+    def add_message(self, message: VarSendMessage) -> None:
+        """Index a message and update its call-site row in place"""
+        entry, is_new = self.index.add(message)
+        table = self.query_one("#callsite-table", DataTable)
+        last_seen = entry.last_seen.strftime("%H:%M:%S")
+        
+        if is_new:
+            table.add_row(entry.key, entry.function, str(entry.count), last_seen, key=entry.key)
+        else:
+            table.update_cell(entry.key, "count", str(entry.count))
+            table.update_cell(entry.key, "last_seen", last_seen)
+    
+    def get_entry(self, key: str) -> Optional[CallSiteEntry]:
+        """Get the call-site entry for a table row key"""
+        return self.index.get(key)
+    
+    def clear(self) -> None:
+        """Forget all call sites"""
+        self.index.clear()
+        self.query_one("#callsite-table", DataTable).clear()
+
+
+class MessageDetailWidget(Static):
+    """Widget showing detailed view of selected message"""
+    
+    def __init__(self):
+        super().__init__()
+        self.current_message: Optional[VarSendMessage] = None
+    
+    def compose(self) -> ComposeResult:
+        with TabbedContent(id="detail-tabs"):
+            with TabPane("Overview", id="overview-tab"):
+                yield Static("Select a message to view details", id="overview-content")
+            
+            with TabPane("Variables", id="variables-tab"):
+                yield VerticalScroll(id="variables-content")
+            
+            with TabPane("Raw Data", id="raw-tab"):
+                yield VerticalScroll(Static("", id="raw-content"))
+    
+    def show_message(self, message: VarSendMessage) -> None:
+        """Display details for the given message"""
+        self.current_message = message
+        self._update_overview()
+        self._update_variables()
+        self._update_raw_data()
+    
+    def _update_overview(self) -> None:
+        """Update the overview tab"""
+        if not self.current_message:
+            return
+            
+        msg = self.current_message
+        
+        # Create overview table
+        table = Table(title="Message Overview", show_header=True, header_style="bold magenta")
+        table.add_column("Property", style="cyan", width=20)
+        table.add_column("Value", style="green")
+        
+        table.add_row("Timestamp", msg.timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
+        table.add_row("Client", f"{msg.client_addr}:{msg.client_port}")
+        table.add_row("Message ID", str(msg.message_id))
+        table.add_row("Size", f"{msg.size_bytes} bytes")
+        table.add_row("Variables", str(len(msg.variables)))
+        
+        if msg.variables:
+            types = list(set(var['type'] for var in msg.variables))
+            table.add_row("Types", ", ".join(types))
+        
+        if 'file' in msg.call_site:
+            table.add_row("Call Site", f"{msg.call_site['file']}:{msg.call_site.get('line', '?')}")
+        for label, key in (("Function", "function"), ("PID", "pid"), ("URI", "uri")):
+            if key in msg.call_site:
+                table.add_row(label, msg.call_site[key])
+        
+        overview_content = self.query_one("#overview-content", Static)
+        overview_content.update(table)
+    
+    def _update_variables(self) -> None:
+        """Update the variables tab"""
+        if not self.current_message:
+            return
+        
+        variables_content = self.query_one("#variables-content", VerticalScroll)
+        variables_content.remove_children()
+        
+        for var in self.current_message.variables:
+            var_widget = self._create_variable_widget(var)
+            variables_content.mount(var_widget)
+    
+    def _create_variable_widget(self, variable: Dict) -> Static:
+        """Create a widget for displaying a single variable"""
+        # Create variable header
+        header = f"Variable #{variable['number']} - {variable['type']}"
+        
+        # Create content based on type
+        content_parts = []
+        
+        if variable['type'] in ['array', 'object']:
+            # For arrays and objects, show metadata and contents
+            if 'element_count' in variable['metadata']:
+                content_parts.append(f"Elements: {variable['metadata']['element_count']}")
+            
+            if 'class_name' in variable['metadata']:
+                content_parts.append(f"Class: {variable['metadata']['class_name']}")
+            
+            if 'contents' in variable['metadata']:
+                content_parts.append("Contents:")
+                # Try to format as syntax-highlighted PHP
+                try:
+                    syntax = Syntax(variable['metadata']['contents'], "php", theme="monokai", line_numbers=False)
+                    content_parts.append(syntax)
+                except:
+                    content_parts.append(variable['metadata']['contents'])
+        else:
+            # For simple types, just show the value
+            content_parts.append(f"Value: {variable['value']}")
+        
+        # Create panel - handle both string and Rich objects
+        if len(content_parts) == 1 and not isinstance(content_parts[0], str):
+            # Single Rich object (like Syntax)
+            panel_content = content_parts[0]
+        else:
+            # Multiple parts or mix of strings and Rich objects
+            panel_content = Group(*content_parts)
+        
+        panel = Panel(
+            panel_content,
+            title=header,
+            title_align="left",
+            border_style="blue",
+            padding=(0, 1)
+        )
+        
+        return Static(panel)
+    
+    def _update_raw_data(self) -> None:
+        """Update the raw data tab"""
+        if not self.current_message:
+            return
+        
+        raw_content = self.query_one("#raw-content", Static)
+        
+        # Format raw data with syntax highlighting
+        syntax = Syntax(
+            self.current_message.raw_data,
+            "text",
+            theme="monokai",
+            line_numbers=True,
+            word_wrap=True
+        )
+        
+        raw_content.update(syntax)
+
+
+class StatsWidget(Static):
+    """Widget showing connection and message statistics"""
+    
+    # Seconds of history drawn in the sparklines
+    SPARKLINE_SECONDS = 30
+    
+    def __init__(self):
+        super().__init__()
+        self.engine = StatsEngine()
+    
+    def compose(self) -> ComposeResult:
+        yield Static("📊 Waiting for connections...", id="stats-display")
+    
+    def on_mount(self) -> None:
+        # Redraw on a fixed tick so rendering cost doesn't scale with message rate
+        self.set_interval(1.0, self._render_stats)
+    
+    def update_stats(self, message: VarSendMessage) -> None:
+        """Update statistics with new message"""
+        self.engine.record(message.client_addr, message.size_bytes)
+    
+    def update_drops(self, drops: Dict[str, int]) -> None:
+        """Add admission-control drop counters reported by the receiver"""
+        self.engine.record_drops(drops)
+    
+    def reset(self) -> None:
+        """Forget all statistics"""
+        self.engine.reset()
+        stats_display = self.query_one("#stats-display", Static)
+        stats_display.update("📊 Waiting for connections...")
+    
+    def _render_stats(self) -> None:
+        """Redraw the statistics table"""
+        engine = self.engine
+        if not engine.message_count and not any(engine.drops.values()):
+            return
+        
+        now = time.time()
+        uptime_str = str(timedelta(seconds=int(now - engine.start_time)))
+        
+        rates = [engine.rates(seconds, now) for seconds in (1, 60, 300)]
+        message_rates = " / ".join(f"{messages:.1f}" for messages, _ in rates)
+        byte_rates = " / ".join(self._format_bytes(int(byte_count)) for _, byte_count in rates)
+        
+        second = int(now)
+        message_spark = sparkline(engine.rolling.series(second, self.SPARKLINE_SECONDS))
+        byte_spark = sparkline(engine.rolling.series(second, self.SPARKLINE_SECONDS, use_bytes=True))
+        
+        sizes = " / ".join(
+            self._format_bytes(int(engine.sizes.quantile(q) or 0)) for q in (0.5, 0.9, 0.99)
+        )
+        top_hosts = ", ".join(f"{host} ({count})" for host, count, _ in engine.hosts.top(3))
+        
+        # Create stats table
+        table = Table(show_header=False, box=None, padding=(0, 1))
+        table.add_column("", style="cyan")
+        table.add_column("", style="green")
+        table.add_column("", style="cyan")
+        table.add_column("", style="green")
+        table.add_column("", style="cyan")
+        table.add_column("", style="green")
+        
+        table.add_row(
+            "📨 Messages:", str(engine.message_count),
+            "💾 Data:", self._format_bytes(engine.total_bytes),
+            "⏱️  Uptime:", uptime_str
+        )
+        table.add_row(
+            "⚡ Msg/s 1s/1m/5m:", message_rates,
+            f"📈 Last {self.SPARKLINE_SECONDS}s:", message_spark,
+            "🖥️  Hosts:", f"{len(engine.hosts.entries)}: {top_hosts}"
+        )
+        table.add_row(
+            "📶 Bytes/s 1s/1m/5m:", byte_rates,
+            f"📉 Last {self.SPARKLINE_SECONDS}s:", byte_spark,
+            "📏 Size p50/p90/p99:", sizes
+        )
+        table.add_row(
+            "🚦 Dropped:", f"{engine.drops['rejected']} conn / {engine.drops['rate_limited']} rate",
+            "🎲 Sampled out:", str(engine.drops['sampled_out']),
+            "", ""
+        )
+        
+        stats_display = self.query_one("#stats-display", Static)
+        stats_display.update(table)
+    
+    def _format_bytes(self, bytes_count: int) -> str:
+        """Format bytes in human readable format"""
+        if bytes_count < 1024:
+            return f"{bytes_count}B"
+        elif bytes_count < 1024 * 1024:
+            return f"{bytes_count / 1024:.1f}KB"
+        else:
+            return f"{bytes_count / (1024 * 1024):.1f}MB"
+
+
+class CustomFooter(Static):
+    """Custom footer with detailed navigation hints"""
+    
+    def compose(self) -> ComposeResult:
+        yield Static("⌨️  q:Quit | c:Clear | f:Filter | s:Save | ↑↓:Navigate | Tab:Switch | Esc:Exit Filter", id="footer-text")
+
+
+class VarSendDebugViewer(App):
+    """Main application for viewing var_send debug messages"""
+    
+    CSS = """
+    #header-container {
+        height: 3;
+        background: $primary;
+    }
+    
+    #stats-container {
+        height: 6;
+        background: $surface;
+        border-bottom: solid $accent;
+    }
+    
+    #main-container {
+        height: 1fr;
+    }
+    
+    #message-list {
+        width: 40%;
+        border-right: solid $accent;
+    }
+    
+    #message-detail {
+        width: 60%;
+    }
+    
+    #message-table, #callsite-table {
+        height: 1fr;
+    }
+    
+    #filter-container {
+        layout: horizontal;
+        height: 3;
+        background: $secondary;
+        padding: 1;
+        border: solid $accent;
+    }
+    
+    .filter-label {
+        width: 10;
+        color: $text;
+        text-align: right;
+        padding-right: 1;
+        background: $secondary;
+    }
+    
+    #filter-input {
+        background: white;
+        border: solid $primary;
+        color: black;
+        height: 1;
+        width: 1fr;
+    }
+    
+    #filter-input:focus {
+        border: solid $success;
+        background: white;
+        color: black;
+    }
+    
+    DataTable {
+        background: $surface;
+    }
+    
+    DataTable > .datatable--cursor {
+        background: $accent;
+    }
+    
+    TabbedContent {
+        height: 1fr;
+    }
+    
+    Static {
+        overflow: auto;
+    }
+    
+    #footer-container {
+        height: 1;
+        background: $primary;
+        dock: bottom;
+    }
+    
+    #footer-text {
+        background: $primary;
+        color: $text;
+        text-align: center;
+        padding: 0 1;
+    }
+    """
+    
+    BINDINGS = [
+        Binding("q", "quit", "Quit"),
+        Binding("c", "clear", "Clear Messages"),
+        Binding("f", "focus_filter", "Filter"),
+        Binding("s", "save_log", "Save Log"),
+        Binding("r", "refresh", "Refresh"),
+        Binding("tab", "focus_next", "Switch Focus"),
+        Binding("up,down", "", "Navigate List"),
+        Binding("escape", "focus_main", "Exit Filter"),
+    ]
+    
+    def __init__(self, receiver: Receiver):
+        super().__init__()
+        self.receiver = receiver
+        self.address = receiver.address
+        self.filter_text = ""
+    
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        
+        with Container(id="stats-container"):
+            yield StatsWidget()
+        
+        with Container(id="filter-container"):
+            yield Static("🔍 Filter:", classes="filter-label")
+            yield Input(placeholder="Type to filter messages... (press 'f' to focus)", id="filter-input", value="")
+        
+        with Horizontal(id="main-container"):
+            with Container(id="message-list"):
+                with TabbedContent(id="list-tabs"):
+                    with TabPane("Messages", id="messages-tab"):
+                        yield MessageListWidget()
+                    with TabPane("Call Sites", id="callsites-tab"):
+                        yield CallSiteWidget()
+            
+            with Container(id="message-detail"):
+                yield MessageDetailWidget()
+        
+        with Container(id="footer-container"):
+            yield CustomFooter()
+    
+    def on_mount(self) -> None:
+        """Initialize the application"""
+        self.title = f"var_send Debug Viewer - {self.address}"
+        self.sub_title = "Ready to receive PHP debug messages"
+        
+        self.receiver.on_message = self._receive_message
+        self.receiver.on_status = self._set_status
+        self.receiver.on_drops = self._receive_drops
+        
+        self.receiver_task = asyncio.create_task(self._run_receiver())
+        # Drop counters are published periodically rather than per message
+        self.set_interval(0.5, self.receiver.publish_drops)
+    
+    async def _run_receiver(self) -> None:
+        """Run the receiver, keeping the UI open if the listener fails"""
+        try:
+            await self.receiver.start()
+        except Exception:
+            pass  # Already shown in the subtitle through on_status
+    
+    def _receive_message(self, message: VarSendMessage) -> None:
+        """Hand a message from the receiver to the UI"""
+        # Update UI by posting a message
+        self.post_message(NewMessageEvent(message))
+    
+    def _set_status(self, text: str) -> None:
+        self.sub_title = text
+    
+    def _receive_drops(self, drops: Dict[str, int]) -> None:
+        self.query_one(StatsWidget).update_drops(drops)
+    
+    def on_new_message_event(self, event: NewMessageEvent) -> None:
+        """Handle new var_send message"""
+        self._update_ui_with_message(event.var_send_message)
+    
+    def _update_ui_with_message(self, message: VarSendMessage) -> None:
+        """Update UI with new message (called from main thread)"""
+        try:
+            # Stats measure ingest, so they count messages hidden by the filter
+            stats_widget = self.query_one(StatsWidget)
+            stats_widget.update_stats(message)
+            
+            # Apply filter
+            if self.filter_text and self.filter_text.lower() not in message.raw_data.lower():
+                return
+            
+            # Update message list
+            message_list = self.query_one(MessageListWidget)
+            message_list.add_message(message)
+            
+            # Update call-site grouping
+            self.query_one(CallSiteWidget).add_message(message)
+            
+            # If this is the first message or no message is selected, show this one
+            message_detail = self.query_one(MessageDetailWidget)
+            if len(message_list.messages) == 1:
+                message_detail.show_message(message)
+                
+            # Update subtitle to show we received a message
+            self.sub_title = f"Received message #{message.message_id} from {message.client_addr}:{message.client_port}"
+            
+        except Exception as e:
+            self.sub_title = f"UI update error: {e}"
+    
+    def on_data_table_row_selected(self, event) -> None:
+        """Handle message selection"""
+        if event.data_table.id == "callsite-table":
+            # Show the most recent message from the selected call site
+            entry = self.query_one(CallSiteWidget).get_entry(event.row_key.value)
+            selected_message = entry.messages[-1] if entry else None
+        else:
+            message_list = self.query_one(MessageListWidget)
+            selected_message = message_list.get_selected_message()
+        
+        if selected_message:
+            message_detail = self.query_one(MessageDetailWidget)
+            message_detail.show_message(selected_message)
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Handle filter input changes"""
+        if event.input.id == "filter-input":
+            self.filter_text = event.value
+            # Update subtitle to show current filter
+            if self.filter_text:
+                self.sub_title = f"🔍 Filtering by: '{self.filter_text}'"
+            else:
+                self.sub_title = "🔍 Filter mode active - type to filter, press Esc to exit"
+            self._refresh_message_list()
+    
+    def _refresh_message_list(self) -> None:
+        """Refresh the message list with current filter"""
+        message_list = self.query_one(MessageListWidget)
+        table = message_list.query_one("#message-table", DataTable)
+        table.clear()
+        
+        # Re-add all messages that match the filter
+        for message in message_list.messages:
+            if not self.filter_text or self.filter_text.lower() in message.raw_data.lower():
+                table.add_row(*message_list.format_row(message))
+    
+    def action_clear(self) -> None:
+        """Clear all messages"""
+        message_list = self.query_one(MessageListWidget)
+        message_list.messages.clear()
+        
+        # Clear the data table
+        table = message_list.query_one("#message-table", DataTable)
+        table.clear()
+        
+        # Clear filter
+        filter_input = self.query_one("#filter-input", Input)
+        filter_input.value = ""
+        self.filter_text = ""
+        
+        # Clear call-site grouping
+        self.query_one(CallSiteWidget).clear()
+        
+        # Clear detail view
+        message_detail = self.query_one(MessageDetailWidget)
+        overview_content = message_detail.query_one("#overview-content", Static)
+        overview_content.update("Select a message to view details")
+        
+        # Reset stats
+        stats_widget = self.query_one(StatsWidget)
+        stats_widget.reset()
+    
+    def action_focus_filter(self) -> None:
+        """Focus the filter input"""
+        filter_input = self.query_one("#filter-input", Input)
+        filter_input.focus()
+        # Clear existing text and show cursor
+        filter_input.value = ""
+        # Update subtitle to show filter is active
+        self.sub_title = "🔍 Filter mode active - type to filter, press Esc to exit"
+    
+    def action_save_log(self) -> None:
+        """Save messages to a log file"""
+        message_list = self.query_one(MessageListWidget)
+        
+        if not message_list.messages:
+            return
+        
+        filename = f"varsend_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        
+        log_data = []
+        for msg in message_list.messages:
+            log_data.append({
+                'timestamp': msg.timestamp.isoformat(),
+                'client': f"{msg.client_addr}:{msg.client_port}",
+                'message_id': msg.message_id,
+                'size_bytes': msg.size_bytes,
+                'call_site': msg.call_site,
+                'variables': msg.variables,
+                'raw_data': msg.raw_data
+            })
+        
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(log_data, f, indent=2, ensure_ascii=False)
+            
+            self.sub_title = f"Log saved to {filename}"
+        except Exception as e:
+            self.sub_title = f"Error saving log: {e}"
+    
+    def action_refresh(self) -> None:
+        """Refresh the display"""
+        self.sub_title = f"Listening on {self.address}"
+    
+    def action_focus_main(self) -> None:
+        """Focus back to main area (exit filter)"""
+        # Clear filter
+        filter_input = self.query_one("#filter-input", Input)
+        filter_input.value = ""
+        self.filter_text = ""
+        
+        # Refresh list without filter
+        self._refresh_message_list()
+        
+        # Focus message table
+        message_list = self.query_one(MessageListWidget)
+        table = message_list.query_one("#message-table", DataTable)
+        table.focus()
+        
+        # Reset subtitle
+        self.sub_title = f"Listening on {self.address}"
@@ -23,6 +23,10 @@ class VarSendErrorHandlingTest extends TestCase
     protected function tearDown(): void
     {
         $this->server->stop();
+
+        // INI changes persist across tests in the same process
+        ini_set('var_send.sample_rate', '1');
+        ini_set('var_send.max_per_second', '0');
     }
 
     /**
@@ -41,6 +45,72 @@ class VarSendErrorHandlingTest extends TestCase
         $this->assertTrue($result, 'var_send should return true when enabled and connected');
     }
 
+    /**
+     * @group sampling
+     */
+    public function testSampleRateZeroSkipsSend(): void
+    {
+        $this->server->start();
+        $this->server->clearMessages();
+
+        ini_set('var_send.sample_rate', '0');
+        $result = var_send('sampled out');
+        $this->assertFalse($result, 'var_send should return false when the call is sampled out');
+
+        $this->assertFalse(
+            $this->server->waitForMessages(1, 500),
+            'Sampled out calls should not reach the server'
+        );
+    }
+
+    /**
+     * @group sampling
+     */
+    public function testPerCallSiteThrottle(): void
+    {
+        $this->server->start();
+        $this->server->clearMessages();
+
+        ini_set('var_send.max_per_second', '3');
+
+        $sent = 0;
+        for ($i = 0; $i < 20; $i++) {
+            if (var_send("Throttled message $i")) {
+                $sent++;
+            }
+        }
+
+        // 3 per second, twice if the loop straddles a second boundary
+        $this->assertGreaterThanOrEqual(3, $sent);
+        $this->assertLessThanOrEqual(6, $sent);
+
+        $this->assertTrue(
+            $this->server->waitForMessages($sent, 2000),
+            "Should receive the $sent messages that were not throttled"
+        );
+        $this->assertCount($sent, $this->server->getMessages());
+
+        // A different call site has its own budget
+        $this->assertTrue(var_send('other call site'));
+    }
+
+    /**
+     * @group sampling
+     */
+    public function testSamplingCountersInPhpInfo(): void
+    {
+        $callsBefore = $this->readPhpInfoCounter('Calls');
+        $sampledOutBefore = $this->readPhpInfoCounter('Calls Sampled Out');
+        $throttledBefore = $this->readPhpInfoCounter('Calls Throttled');
+
+        ini_set('var_send.sample_rate', '0');
+        $this->assertFalse(var_send('counted'));
+
+        $this->assertSame($callsBefore + 1, $this->readPhpInfoCounter('Calls'));
+        $this->assertSame($sampledOutBefore + 1, $this->readPhpInfoCounter('Calls Sampled Out'));
+        $this->assertSame($throttledBefore, $this->readPhpInfoCounter('Calls Throttled'));
+    }
+
     /**
      * @group connection
      */
@@ -303,4 +373,23 @@ class VarSendErrorHandlingTest extends TestCase
             'Should receive the valid message'
         );
     }
+
+    /**
+     * Current value of a var_send counter row in the CLI phpinfo() output
+     */
+    private function readPhpInfoCounter(string $label): int
+    {
+        ob_start();
+        phpinfo(INFO_MODULES);
+        $info = ob_get_clean();
+
+        $this->assertMatchesRegularExpression(
+            '/^' . preg_quote($label, '/') . ' => \d+$/m',
+            $info,
+            "phpinfo() should show the '$label' counter"
+        );
+        preg_match('/^' . preg_quote($label, '/') . ' => (\d+)$/m', $info, $matches);
+
+        return (int)$matches[1];
+    }
 }
\ No newline at end of file
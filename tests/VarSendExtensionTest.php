@@ -191,4 +191,32 @@ class VarSendExtensionTest extends TestCase
         $this->assertStringContainsString('Variable #4', $messages[3]['data']);
         $this->assertStringContainsString('Type: object', $messages[3]['data']);
     }
-}
\ No newline at end of file
+
+    /**
+     * @group callsite
+     */
+    public function testCallSiteMetadata(): void
+    {
+        $this->server->clearMessages();
+
+        $line = __LINE__ + 1;
+        var_send("first", "second");
+
+        $this->assertTrue(
+            $this->server->waitForMessages(2, 2000),
+            'Should receive 2 messages for 2 variables'
+        );
+
+        $messages = $this->server->getMessages();
+        $this->assertCount(2, $messages);
+
+        // Every frame carries the call-site header of the var_send() call
+        foreach ($messages as $message) {
+            $this->assertStringStartsWith('--- Call Site ---', $message['data']);
+            $this->assertStringContainsString('File: ' . __FILE__, $message['data']);
+            $this->assertStringContainsString("Line: $line", $message['data']);
+            $this->assertStringContainsString('Function: ' . __CLASS__ . '::' . __FUNCTION__, $message['data']);
+            $this->assertStringContainsString('PID: ' . getmypid(), $message['data']);
+        }
+    }
+}
@@ -0,0 +1,87 @@
+<?php
+
+namespace VarSend\Tests;
+
+use PHPUnit\Framework\TestCase;
+
+/**
+ * Latency comparison between the TCP and Unix domain socket transports
+ */
+class VarSendTransportBenchmarkTest extends TestCase
+{
+    private const ITERATIONS = 50;
+    private const TCP_PORT = 9002;
+
+    private string $socketPath;
+
+    protected function setUp(): void
+    {
+        $this->socketPath = sys_get_temp_dir() . '/var_send_bench.sock';
+        ini_set('var_send.enabled', '1');
+    }
+
+    protected function tearDown(): void
+    {
+        (new SimpleTestServer())->stop();
+        @unlink($this->socketPath);
+
+        ini_set('var_send.server_host', '127.0.0.1');
+        ini_set('var_send.server_port', (string)self::TCP_PORT);
+    }
+
+    /**
+     * @group benchmark
+     */
+    public function testUnixSocketLatencyComparedToTcp(): void
+    {
+        $tcpMedian = $this->measureMedianLatency('127.0.0.1');
+        $unixMedian = $this->measureMedianLatency('unix:' . $this->socketPath);
+
+        fwrite(STDERR, sprintf(
+            "\nvar_send median latency over %d calls: tcp %.1fµs, unix %.1fµs (%.2fx)\n",
+            self::ITERATIONS,
+            $tcpMedian / 1000,
+            $unixMedian / 1000,
+            $unixMedian > 0 ? $tcpMedian / $unixMedian : 0
+        ));
+
+        // Unix sockets skip the TCP handshake and loopback stack; allow for noise
+        $this->assertLessThan($tcpMedian * 1.5, $unixMedian,
+            'Unix socket transport should not be slower than TCP');
+    }
+
+    /**
+     * Median wall time of a single var_send() call, in nanoseconds
+     */
+    private function measureMedianLatency(string $host): float
+    {
+        $server = new SimpleTestServer($host, self::TCP_PORT);
+        $server->start();
+        $server->clearMessages();
+
+        ini_set('var_send.server_host', $host);
+        ini_set('var_send.server_port', (string)self::TCP_PORT);
+
+        $payload = ['id' => 123, 'name' => 'benchmark', 'tags' => ['a', 'b', 'c']];
+        $timings = [];
+
+        for ($i = 0; $i < self::ITERATIONS; $i++) {
+            $start = hrtime(true);
+            $result = var_send($payload);
+            $timings[] = hrtime(true) - $start;
+
+            $this->assertTrue($result, "var_send over $host should succeed");
+
+            // Let the single-threaded test server drain before the next call
+            $this->assertTrue(
+                $server->waitForMessages($i + 1, 2000),
+                "Should receive message $i over $host"
+            );
+        }
+
+        $server->stop();
+
+        sort($timings);
+        return (float)$timings[intdiv(count($timings), 2)];
+    }
+}
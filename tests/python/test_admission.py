@@ -0,0 +1,160 @@
+"""
+Unit tests for the debug viewer's admission control (ingest.py)
+Run with: python3 -m unittest discover -s tests/python
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src", "debug-server", "python"))
+
+import ingest  # noqa: E402
+from ingest import AdmissionController, AdmissionPolicy  # noqa: E402
+
+
+class AdmissionPolicySplitTest(unittest.TestCase):
+
+    def test_split_never_exceeds_global_limits(self):
+        worker = AdmissionPolicy(max_connections=10, rate_limit=100.0, rate_burst=10).split(4)
+
+        self.assertEqual(worker.max_connections, 2)
+        self.assertLessEqual(worker.max_connections * 4, 10)
+        self.assertEqual(worker.rate_limit, 25.0)
+        self.assertEqual(worker.rate_burst, 2)
+
+    def test_split_rejects_fewer_connections_than_workers(self):
+        with self.assertRaises(ValueError):
+            AdmissionPolicy(max_connections=1).split(4)
+
+    def test_split_keeps_disabled_limits_and_sampling(self):
+        worker = AdmissionPolicy(sample_rate=0.5, sample_every=3).split(4)
+
+        self.assertEqual(worker.max_connections, 0)
+        self.assertEqual(worker.rate_limit, 0.0)
+        self.assertEqual(worker.rate_burst, 0)
+        self.assertEqual(worker.sample_rate, 0.5)
+        self.assertEqual(worker.sample_every, 3)
+
+    def test_split_rejects_smaller_burst_than_workers(self):
+        with self.assertRaises(ValueError):
+            AdmissionPolicy(rate_limit=8.0, rate_burst=2).split(4)
+        # The default burst is one second of the rate limit
+        with self.assertRaises(ValueError):
+            AdmissionPolicy(rate_limit=1.0).split(4)
+
+    def test_split_divides_default_burst(self):
+        worker = AdmissionPolicy(rate_limit=10.0).split(4)
+
+        self.assertEqual(worker.rate_burst, 2)
+        self.assertLessEqual(worker.rate_burst * 4, 10)
+
+
+class AdmissionControllerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(ingest.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def admitted(self, controller, count, client="10.0.0.1"):
+        return sum(controller.admit_message(client) for _ in range(count))
+
+    def test_connection_limit(self):
+        controller = AdmissionController(AdmissionPolicy(max_connections=2))
+
+        self.assertTrue(controller.admit_connection())
+        self.assertTrue(controller.admit_connection())
+        self.assertFalse(controller.admit_connection())
+
+        controller.release_connection()
+        self.assertTrue(controller.admit_connection())
+        self.assertEqual(controller.counters["rejected"], 1)
+
+    def test_burst_defaults_to_one_second_of_rate(self):
+        controller = AdmissionController(AdmissionPolicy(rate_limit=5.0))
+
+        self.assertEqual(self.admitted(controller, 10), 5)
+        self.assertEqual(controller.counters["rate_limited"], 5)
+
+    def test_burst_is_at_least_one_token(self):
+        controller = AdmissionController(AdmissionPolicy(rate_limit=0.5))
+
+        self.assertEqual(self.admitted(controller, 3), 1)
+
+    def test_explicit_burst(self):
+        controller = AdmissionController(AdmissionPolicy(rate_limit=5.0, rate_burst=8))
+
+        self.assertEqual(self.admitted(controller, 10), 8)
+
+    def test_token_bucket_refills_with_time(self):
+        controller = AdmissionController(AdmissionPolicy(rate_limit=10.0))
+        self.assertEqual(self.admitted(controller, 10), 10)
+        self.assertFalse(controller.admit_message("10.0.0.1"))
+
+        self.now += 0.5
+        self.assertEqual(self.admitted(controller, 10), 5)
+
+        # Refill is capped at the burst size
+        self.now += 60.0
+        self.assertEqual(self.admitted(controller, 20), 10)
+
+    def test_buckets_are_per_client_host(self):
+        controller = AdmissionController(AdmissionPolicy(rate_limit=2.0))
+
+        self.assertEqual(self.admitted(controller, 5, "10.0.0.1"), 2)
+        self.assertEqual(self.admitted(controller, 5, "10.0.0.2"), 2)
+
+    def test_tracked_clients_are_bounded(self):
+        controller = AdmissionController(AdmissionPolicy(rate_limit=1.0))
+
+        for i in range(ingest.MAX_TRACKED_CLIENTS + 10):
+            controller.admit_message(f"host-{i}")
+
+        self.assertEqual(len(controller.buckets), ingest.MAX_TRACKED_CLIENTS)
+        # Least recently seen clients are evicted first
+        self.assertNotIn("host-0", controller.buckets)
+        self.assertIn(f"host-{ingest.MAX_TRACKED_CLIENTS + 9}", controller.buckets)
+
+        # An evicted client starts over with a full bucket
+        self.assertTrue(controller.admit_message("host-0"))
+
+    def test_sample_every_nth(self):
+        controller = AdmissionController(AdmissionPolicy(sample_every=3))
+
+        kept = [controller.admit_message("10.0.0.1") for _ in range(9)]
+
+        self.assertEqual(kept, [False, False, True] * 3)
+        self.assertEqual(controller.counters["sampled_out"], 6)
+
+    def test_probabilistic_sampling(self):
+        controller = AdmissionController(AdmissionPolicy(sample_rate=0.5))
+
+        with mock.patch.object(ingest.random, "random", side_effect=[0.1, 0.7, 0.49, 0.5]):
+            kept = [controller.admit_message("10.0.0.1") for _ in range(4)]
+
+        self.assertEqual(kept, [True, False, True, False])
+        self.assertEqual(controller.counters["sampled_out"], 2)
+
+    def test_sampled_out_messages_do_not_consume_tokens(self):
+        controller = AdmissionController(AdmissionPolicy(rate_limit=2.0, sample_every=2))
+
+        kept = [controller.admit_message("10.0.0.1") for _ in range(6)]
+
+        self.assertEqual(kept, [False, True, False, True, False, False])
+        self.assertEqual(controller.counters, {"rejected": 0, "rate_limited": 1, "sampled_out": 3})
+
+    def test_take_counters_resets(self):
+        controller = AdmissionController(AdmissionPolicy(max_connections=1, sample_every=2))
+        controller.admit_connection()
+        controller.admit_connection()
+        controller.admit_message("10.0.0.1")
+
+        self.assertEqual(controller.take_counters(), {"rejected": 1, "rate_limited": 0, "sampled_out": 1})
+        self.assertEqual(controller.take_counters(), {"rejected": 0, "rate_limited": 0, "sampled_out": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Unit tests for the debug viewer's message parser (message_parser.py)
+Run with: python3 -m unittest discover -s tests/python
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src", "debug-server", "python"))
+
+from message_parser import MessageParser  # noqa: E402
+
+
+ARRAY_MESSAGE = (
+    "--- Call Site ---\n"
+    "File: /var/www/index.php\n"
+    "Line: 12\n"
+    "Function: App\\Controller::show\n"
+    "PID: 4242\n"
+    "URI: /users/7\n"
+    "\n"
+    "--- Variable #1 ---\n"
+    "Type: array\n"
+    "Array with 2 elements\n"
+    "Array contents: array (\n"
+    "  'id' => 7,\n"
+    "\n"
+    "  'tags' => \n"
+    "  array (\n"
+    "    0 => 'a',\n"
+    "  ),\n"
+    ")\n"
+)
+
+
+class MessageParserTest(unittest.TestCase):
+
+    def test_parse_array_variable(self):
+        variables = MessageParser.parse_message(ARRAY_MESSAGE)
+
+        self.assertEqual(len(variables), 1)
+        self.assertEqual(variables[0]["type"], "array")
+        self.assertEqual(variables[0]["metadata"]["element_count"], "2")
+        self.assertEqual(
+            variables[0]["metadata"]["contents"],
+            "  'id' => 7,\n\n  'tags' => \n  array (\n    0 => 'a',\n  ),\n)"
+        )
+
+    def test_parse_call_site(self):
+        self.assertEqual(MessageParser.parse_call_site(ARRAY_MESSAGE), {
+            "file": "/var/www/index.php",
+            "line": "12",
+            "function": "App\\Controller::show",
+            "pid": "4242",
+            "uri": "/users/7",
+        })
+
+    def test_contents_spans_resolve_to_the_same_variables(self):
+        messages = [
+            ARRAY_MESSAGE,
+            "\n\n" + ARRAY_MESSAGE + "\n\n",
+            "--- Variable #1 ---\nType: object\nObject of class 'Foo'\n"
+            "Object contents: \\Foo::__set_state(array(\n   'x' => 1,\n))\n"
+            "--- Variable #2 ---\nType: integer\nValue: 5\n",
+            "--- Variable #1 ---\nType: array\nArray with 0 elements\nArray contents: \n",
+        ]
+
+        for raw in messages:
+            compact = MessageParser.parse_message(raw, with_contents=False)
+            self.assertFalse(any("contents" in v["metadata"] for v in compact))
+
+            MessageParser.attach_contents(raw, compact)
+            self.assertEqual(compact, MessageParser.parse_message(raw))
+
+
+if __name__ == "__main__":
+    unittest.main()
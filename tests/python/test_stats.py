@@ -0,0 +1,150 @@
+"""
+Unit tests for the debug viewer's rolling statistics (stats.py)
+Run with: python3 -m unittest discover -s tests/python
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src", "debug-server", "python"))
+
+from stats import HostTable, RollingCounter, SizeSketch, StatsEngine, sparkline  # noqa: E402
+
+
+class RollingCounterTest(unittest.TestCase):
+
+    def test_totals_cover_complete_seconds_only(self):
+        counter = RollingCounter(slots=10)
+        counter.add(100, 10)
+        counter.add(101, 20)
+        counter.add(101, 30)
+        counter.add(102, 40)
+
+        # The current second (102) is still in progress
+        self.assertEqual(counter.totals(102, 5), (3, 60))
+        self.assertEqual(counter.totals(102, 1), (2, 50))
+        self.assertEqual(counter.totals(103, 5), (4, 100))
+
+    def test_window_expiry(self):
+        counter = RollingCounter(slots=10)
+        counter.add(100, 10)
+
+        self.assertEqual(counter.totals(106, 5), (0, 0))
+        self.assertEqual(counter.totals(106, 6), (1, 10))
+        # Long after the slot was written, it must not reappear
+        self.assertEqual(counter.totals(111, 10), (0, 0))
+
+    def test_slot_reuse_discards_previous_second(self):
+        counter = RollingCounter(slots=5)
+        counter.add(3, 100)
+        counter.add(3, 100)
+        counter.add(8, 7)  # Same slot as second 3
+
+        self.assertEqual(counter.totals(9, 5), (1, 7))
+        self.assertEqual(counter.series(9, 5), [0, 0, 0, 0, 1])
+        self.assertEqual(counter.series(9, 5, use_bytes=True), [0, 0, 0, 0, 7])
+
+    def test_reset(self):
+        counter = RollingCounter(slots=5)
+        counter.add(1, 10)
+        counter.reset()
+
+        self.assertEqual(counter.totals(2, 5), (0, 0))
+
+
+class SizeSketchTest(unittest.TestCase):
+
+    def test_empty_sketch(self):
+        self.assertIsNone(SizeSketch().quantile(0.5))
+
+    def test_zero_sized_values(self):
+        sketch = SizeSketch()
+        sketch.add(0)
+
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(42)
+        values = [int(rng.lognormvariate(8, 2)) + 1 for _ in range(5000)]
+        sketch = SizeSketch(accuracy=0.02)
+        for value in values:
+            sketch.add(value)
+
+        values.sort()
+        for q in (0.0, 0.25, 0.5, 0.9, 0.99, 1.0):
+            expected = values[int(q * (len(values) - 1))]
+            estimate = sketch.quantile(q)
+            self.assertLessEqual(abs(estimate - expected) / expected, 0.02,
+                                 f"q={q}: estimate {estimate}, expected {expected}")
+
+    def test_values_above_max_are_clamped(self):
+        sketch = SizeSketch(max_value=1000)
+        sketch.add(10 ** 9)
+
+        self.assertLessEqual(sketch.quantile(1.0), 1000 * 1.05)
+
+    def test_reset(self):
+        sketch = SizeSketch()
+        sketch.add(100)
+        sketch.reset()
+
+        self.assertEqual(sketch.count, 0)
+        self.assertIsNone(sketch.quantile(0.5))
+
+
+class HostTableTest(unittest.TestCase):
+
+    def test_cardinality_is_bounded(self):
+        table = HostTable(capacity=4)
+        for i in range(1000):
+            table.add(f"10.0.{i // 256}.{i % 256}", 1)
+
+        self.assertEqual(len(table.entries), 4)
+
+    def test_heavy_hitters_survive_eviction(self):
+        table = HostTable(capacity=4)
+        for i in range(1000):
+            table.add("busy", 10)
+            if i % 2:
+                table.add("steady", 5)
+            table.add(f"one-off-{i}", 1)
+
+        top = table.top(2)
+        self.assertEqual([host for host, _, _ in top], ["busy", "steady"])
+        self.assertEqual(top[0][1:], (1000, 10000))
+
+    def test_counts_overestimate_by_at_most_the_inherited_floor(self):
+        table = HostTable(capacity=3)
+        true_counts = {}
+        rng = random.Random(7)
+        for _ in range(2000):
+            host = f"host-{min(int(rng.expovariate(0.5)), 20)}"
+            true_counts[host] = true_counts.get(host, 0) + 1
+            table.add(host, 1)
+
+        for host, (messages, _, overestimate) in table.entries.items():
+            self.assertGreaterEqual(messages, true_counts[host])
+            self.assertLessEqual(messages - overestimate, true_counts[host])
+
+
+class StatsEngineTest(unittest.TestCase):
+
+    def test_rates_are_not_diluted_before_start(self):
+        engine = StatsEngine()
+        start = engine.start_time
+        for _ in range(10):
+            engine.record("10.0.0.1", 100, now=start)
+
+        messages_per_second, bytes_per_second = engine.rates(60, now=start + 2)
+        self.assertEqual(messages_per_second, 5.0)
+        self.assertEqual(bytes_per_second, 500.0)
+
+    def test_sparkline(self):
+        self.assertEqual(sparkline([0, 0]), "▁▁")
+        self.assertEqual(sparkline([0, 2, 14]), "▁▂█")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,15 +3,30 @@ $host = $argv[1] ?? "127.0.0.1";
 $port = (int)($argv[2] ?? 9002);
 $messageFile = sys_get_temp_dir() . "/var_send_test_messages.json";
 
-$socket = socket_create(AF_INET, SOCK_STREAM, SOL_TCP);
-if ($socket === false) {
-    exit(1);
-}
+if (strncmp($host, "unix:", 5) === 0) {
+    // Unix domain socket transport: var_send.server_host = "unix:/path.sock"
+    $path = substr($host, 5);
+    @unlink($path);
 
-socket_set_option($socket, SOL_SOCKET, SO_REUSEADDR, 1);
+    $socket = socket_create(AF_UNIX, SOCK_STREAM, 0);
+    if ($socket === false) {
+        exit(1);
+    }
 
-if (!socket_bind($socket, $host, $port)) {
-    exit(1);
+    if (!socket_bind($socket, $path)) {
+        exit(1);
+    }
+} else {
+    $socket = socket_create(AF_INET, SOCK_STREAM, SOL_TCP);
+    if ($socket === false) {
+        exit(1);
+    }
+
+    socket_set_option($socket, SOL_SOCKET, SO_REUSEADDR, 1);
+
+    if (!socket_bind($socket, $host, $port)) {
+        exit(1);
+    }
 }
 
 if (!socket_listen($socket, 5)) {